@@ -25,6 +25,18 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    # The full-text search index is made with raw DDL (app/utils/search.py),
+    # not from the models; without this, autogenerate would drop it
+    if type_ == "table" and name.startswith("listings_fts"):
+        return False  # FTS5 table and its shadow tables, SQLite
+    if type_ == "column" and name == "search_vector":
+        return False  # Generated tsvector column, PostgreSQL
+    if type_ == "index" and name == "ix_listings_search_vector":
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -47,6 +59,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -70,7 +83,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,34 @@
+"""add_crawl_job_leases
+
+Revision ID: 4b6d0e93a1c2
+Revises: 7c2e9d41f0b8
+Create Date: 2026-10-17 14:21:07.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b6d0e93a1c2'
+down_revision: Union[str, Sequence[str], None] = '7c2e9d41f0b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('crawl_jobs', sa.Column('lease_owner', sa.String(), nullable=True))
+    op.add_column('crawl_jobs', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('crawl_jobs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_crawl_jobs_claim', 'crawl_jobs', ['run_id', 'status', 'lease_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_crawl_jobs_claim', table_name='crawl_jobs')
+    op.drop_column('crawl_jobs', 'attempts')
+    op.drop_column('crawl_jobs', 'lease_expires_at')
+    op.drop_column('crawl_jobs', 'lease_owner')
@@ -0,0 +1,39 @@
+"""add_listing_changes
+
+Revision ID: 5f8b2a6c7d19
+Revises: e1a7c5d93f40
+Create Date: 2026-10-17 16:41:07.218563
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f8b2a6c7d19'
+down_revision: Union[str, Sequence[str], None] = 'e1a7c5d93f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('listing_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('listing_id', sa.Integer(), nullable=False),
+    sa.Column('run_id', sa.Integer(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.Column('changes', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['run_id'], ['scrape_runs.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_listing_changes_listing_time', 'listing_changes', ['listing_id', 'changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_listing_changes_listing_time', table_name='listing_changes')
+    op.drop_table('listing_changes')
@@ -0,0 +1,28 @@
+"""index_auction_end_date
+
+Revision ID: 6d2f9b4e8a15
+Revises: c3e8f1a2b7d4
+Create Date: 2026-10-17 19:12:36.804127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2f9b4e8a15'
+down_revision: Union[str, Sequence[str], None] = 'c3e8f1a2b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_listings_auction_end_date'), 'listings', ['auction_end_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_listings_auction_end_date'), table_name='listings')
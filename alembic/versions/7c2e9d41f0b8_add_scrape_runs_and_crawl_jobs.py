@@ -0,0 +1,59 @@
+"""add_scrape_runs_and_crawl_jobs
+
+Revision ID: 7c2e9d41f0b8
+Revises: a3f81c0e5b27
+Create Date: 2026-10-17 13:05:51.377912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9d41f0b8'
+down_revision: Union[str, Sequence[str], None] = 'a3f81c0e5b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scrape_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_page', sa.Integer(), nullable=False),
+    sa.Column('total_pages', sa.Integer(), nullable=True),
+    sa.Column('discovery_done', sa.Boolean(), nullable=False),
+    sa.Column('stats', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scrape_runs_id'), 'scrape_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_scrape_runs_status'), 'scrape_runs', ['status'], unique=False)
+    op.create_table('crawl_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('run_id', sa.Integer(), nullable=False),
+    sa.Column('detail_url', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('summary_hash', sa.String(length=64), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['run_id'], ['scrape_runs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('run_id', 'detail_url', name='uq_crawl_jobs_run_url')
+    )
+    op.create_index(op.f('ix_crawl_jobs_id'), 'crawl_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_crawl_jobs_run_id'), 'crawl_jobs', ['run_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_crawl_jobs_run_id'), table_name='crawl_jobs')
+    op.drop_index(op.f('ix_crawl_jobs_id'), table_name='crawl_jobs')
+    op.drop_table('crawl_jobs')
+    op.drop_index(op.f('ix_scrape_runs_status'), table_name='scrape_runs')
+    op.drop_index(op.f('ix_scrape_runs_id'), table_name='scrape_runs')
+    op.drop_table('scrape_runs')
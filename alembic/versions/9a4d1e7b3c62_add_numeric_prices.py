@@ -0,0 +1,118 @@
+"""add_numeric_prices
+
+Revision ID: 9a4d1e7b3c62
+Revises: 5f8b2a6c7d19
+Create Date: 2026-10-17 17:20:44.630192
+
+"""
+import re
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d1e7b3c62'
+down_revision: Union[str, Sequence[str], None] = '5f8b2a6c7d19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRICE_FIELDS = ('starting_price', 'current_offer', 'guarantee_amount')
+VALUE_COLUMNS = [f"{field}_value" for field in PRICE_FIELDS] + ['price_value']
+BATCH_SIZE = 1000
+
+# The price parsing of app/scraper/detail_scraper.py as of this revision,
+# copied so that later changes to the scraper don't change what this
+# migration writes
+_NOT_AMOUNT = re.compile(r"[^\d.,]")
+_CURRENCIES = [
+    ("RON", re.compile(r"\b(lei|ron)\b", re.IGNORECASE)),
+    ("EUR", re.compile(r"€|\b(eur|euro)\b", re.IGNORECASE)),
+    ("USD", re.compile(r"\$|\busd\b", re.IGNORECASE)),
+]
+
+
+def _parse_currency(price_str: Optional[str]) -> Optional[str]:
+    if not price_str:
+        return None
+    for code, pattern in _CURRENCIES:
+        if pattern.search(price_str):
+            return code
+    return None
+
+
+def _parse_price(price_str: Optional[str]) -> Optional[float]:
+    if not price_str:
+        return None
+    clean_str = _NOT_AMOUNT.sub("", price_str)
+    if not clean_str:
+        return None
+    dot_count = clean_str.count('.')
+    comma_count = clean_str.count(',')
+    if dot_count == 0 and comma_count == 0:
+        pass
+    elif dot_count > 1:
+        clean_str = clean_str.replace('.', '').replace(',', '.')  # "1.234.567,89"
+    elif comma_count > 1:
+        clean_str = clean_str.replace(',', '')  # "1,234,567.89"
+    elif dot_count == 1 and comma_count == 1:
+        if clean_str.rfind(',') > clean_str.rfind('.'):
+            clean_str = clean_str.replace('.', '').replace(',', '.')  # "1.200,50"
+        else:
+            clean_str = clean_str.replace(',', '')  # "1,200.50"
+    elif len(clean_str) - max(clean_str.rfind('.'), clean_str.rfind(',')) == 4:
+        clean_str = clean_str.replace('.', '').replace(',', '')  # "1.200", "1,200"
+    elif comma_count == 1:
+        clean_str = clean_str.replace(',', '.')  # "1200,50"
+    try:
+        return float(clean_str)
+    except ValueError:
+        return None
+
+
+def _price_columns(row: dict) -> dict:
+    columns = {f"{field}_value": _parse_price(row[field]) for field in PRICE_FIELDS}
+    # An offer of 0 means nobody has bid yet
+    offer = columns['current_offer_value'] or None
+    columns['price_value'] = offer if offer is not None else columns['starting_price_value']
+    columns['currency'] = next(filter(None, (_parse_currency(row[field]) for field in PRICE_FIELDS)), None)
+    return columns
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in VALUE_COLUMNS:
+        op.add_column('listings', sa.Column(column, sa.Numeric(precision=14, scale=2, asdecimal=False), nullable=True))
+    op.add_column('listings', sa.Column('currency', sa.String(length=3), nullable=True))
+    op.create_index(op.f('ix_listings_price_value'), 'listings', ['price_value'], unique=False)
+
+    # Backfill from the price strings, parsed like at scrape time
+    listings = sa.table(
+        'listings',
+        sa.column('id', sa.Integer),
+        sa.column('currency', sa.String),
+        *[sa.column(field, sa.String) for field in PRICE_FIELDS],
+        *[sa.column(column, sa.Numeric(asdecimal=False)) for column in VALUE_COLUMNS],
+    )
+    bind = op.get_bind()
+    statement = listings.update().where(listings.c.id == sa.bindparam('row_id'))
+    # Paged by id, so only one batch of listings is in memory at a time
+    last_id = None
+    while True:
+        query = sa.select(listings.c.id, *[listings.c[field] for field in PRICE_FIELDS]).order_by(listings.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(listings.c.id > last_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            break
+        bind.execute(statement, [{'row_id': row.id, **_price_columns(row._asdict())} for row in rows])
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_listings_price_value'), table_name='listings')
+    op.drop_column('listings', 'currency')
+    for column in reversed(VALUE_COLUMNS):
+        op.drop_column('listings', column)
@@ -0,0 +1,28 @@
+"""add_listing_summary_hash
+
+Revision ID: a3f81c0e5b27
+Revises: d95c6b126538
+Create Date: 2026-10-17 12:14:40.218563
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f81c0e5b27'
+down_revision: Union[str, Sequence[str], None] = 'd95c6b126538'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('listings', sa.Column('summary_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('listings', 'summary_hash')
@@ -0,0 +1,28 @@
+"""add_scrape_run_owner
+
+Revision ID: b8d4f2a61e07
+Revises: 6d2f9b4e8a15
+Create Date: 2026-10-17 21:05:12.318844
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4f2a61e07'
+down_revision: Union[str, Sequence[str], None] = '6d2f9b4e8a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scrape_runs', sa.Column('owner', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('scrape_runs', 'owner')
@@ -0,0 +1,32 @@
+"""add_listing_search_index
+
+Revision ID: c3e8f1a2b7d4
+Revises: 9a4d1e7b3c62
+Create Date: 2026-10-17 18:05:12.447913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8f1a2b7d4'
+down_revision: Union[str, Sequence[str], None] = '9a4d1e7b3c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FTS5 table + triggers on SQLite, tsvector column + GIN index on
+    # PostgreSQL; both index the existing rows
+    create_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_search_index(op.get_bind())
@@ -0,0 +1,36 @@
+"""add_refresh_scheduling
+
+Revision ID: d95c6b126538
+Revises: dcd0bac862f1
+Create Date: 2026-10-17 11:02:15.904321
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd95c6b126538'
+down_revision: Union[str, Sequence[str], None] = 'dcd0bac862f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('listings', sa.Column('last_checked_at', sa.DateTime(), nullable=True))
+    op.add_column('listings', sa.Column('last_changed_at', sa.DateTime(), nullable=True))
+    op.add_column('listings', sa.Column('refresh_interval', sa.Integer(), nullable=True))
+    op.add_column('listings', sa.Column('next_refresh_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_listings_next_refresh_at'), 'listings', ['next_refresh_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_listings_next_refresh_at'), table_name='listings')
+    op.drop_column('listings', 'next_refresh_at')
+    op.drop_column('listings', 'refresh_interval')
+    op.drop_column('listings', 'last_changed_at')
+    op.drop_column('listings', 'last_checked_at')
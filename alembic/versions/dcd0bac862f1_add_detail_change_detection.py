@@ -0,0 +1,32 @@
+"""add_detail_change_detection
+
+Revision ID: dcd0bac862f1
+Revises: f45a2841c8ac
+Create Date: 2026-10-17 09:12:40.318211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dcd0bac862f1'
+down_revision: Union[str, Sequence[str], None] = 'f45a2841c8ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('listings', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('listings', sa.Column('etag', sa.String(), nullable=True))
+    op.add_column('listings', sa.Column('last_modified', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('listings', 'last_modified')
+    op.drop_column('listings', 'etag')
+    op.drop_column('listings', 'content_hash')
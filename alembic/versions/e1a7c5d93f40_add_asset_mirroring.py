@@ -0,0 +1,44 @@
+"""add_asset_mirroring
+
+Revision ID: e1a7c5d93f40
+Revises: 4b6d0e93a1c2
+Create Date: 2026-10-17 15:12:33.504817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a7c5d93f40'
+down_revision: Union[str, Sequence[str], None] = '4b6d0e93a1c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('assets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(), nullable=True),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('content_type', sa.String(), nullable=True),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_assets_id'), 'assets', ['id'], unique=False)
+    op.create_index(op.f('ix_assets_sha256'), 'assets', ['sha256'], unique=False)
+    op.create_index(op.f('ix_assets_url'), 'assets', ['url'], unique=True)
+    op.add_column('listings', sa.Column('mirrored_assets', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('listings', 'mirrored_assets')
+    op.drop_index(op.f('ix_assets_url'), table_name='assets')
+    op.drop_index(op.f('ix_assets_sha256'), table_name='assets')
+    op.drop_index(op.f('ix_assets_id'), table_name='assets')
+    op.drop_table('assets')
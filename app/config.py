@@ -1,11 +1,61 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./anabi.db"
+    DATABASE_ASYNC_URL: Optional[str] = None  # For the API's reads; derived from DATABASE_URL for SQLite/PostgreSQL
+    SQLITE_PRODUCTION_MODE: bool = False  # WAL, tuned pragmas, separate read-only pool for the API
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # How long a write waits for the lock before failing
+    SQLITE_CACHE_SIZE_MB: int = 64  # Page cache, per connection
+    SQLITE_MMAP_SIZE_MB: int = 256
+    DATABASE_READ_POOL_SIZE: int = 5  # Read-only connections kept for the API
+    LISTINGS_COUNT_LIMIT: int = 10000  # X-Total-Count stops counting here
+    LISTINGS_EXPORT_BATCH_SIZE: int = 1000  # Rows fetched and written at a time by GET /listings/export
+    RESPONSE_CACHE_ENABLED: bool = True  # Cache GET /listings responses until the scraper writes
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_TTL_SECONDS: float = 60.0  # Upper bound on staleness when workers write from other processes
+    RESPONSE_CACHE_REDIS_URL: Optional[str] = None  # Shared cache; needs the optional 'redis' package
     SCRAPER_USER_AGENT: str = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    SCRAPER_REQUEST_DELAY: float = 1.0
+    SCRAPER_TIMEOUT: float = 30.0
+    SCRAPER_MAX_CONNECTIONS: int = 10  # Shared HTTP connection pool
+    SCRAPER_MAX_KEEPALIVE: int = 10
+    SCRAPER_KEEPALIVE_EXPIRY: float = 30.0
+    SCRAPER_HTTP2: bool = False  # Needs the optional 'h2' package
+    SCRAPER_REQUEST_DELAY: float = 1.0  # Used as 1/rate when SCRAPER_REQUESTS_PER_SECOND is unset
+    SCRAPER_REQUESTS_PER_SECOND: Optional[float] = None
+    SCRAPER_BURST: int = 1
+    SCRAPER_CONCURRENCY: int = 4
+    SCRAPER_MIN_REQUESTS_PER_SECOND: float = 0.1  # Floor when the site pushes back
+    SCRAPER_MAX_RETRIES: int = 3
+    SCRAPER_BACKOFF_BASE: float = 1.0  # Seconds; doubles per retry, with jitter
+    SCRAPER_BACKOFF_MAX: float = 60.0
+    SCRAPER_BREAKER_THRESHOLD: int = 10  # Consecutive failed attempts before a run is aborted
+    SCRAPER_BREAKER_COOLDOWN: float = 300.0
+    SCRAPER_HTML_PARSER: str = "html.parser"  # html.parser, lxml or html5lib
+    SCRAPER_PARTIAL_PARSE: bool = True
+    SCRAPER_PARSE_WORKERS: Optional[int] = None  # Parser processes; unset = CPU count, 0 = parse inline
+    SCRAPER_QUEUE_SIZE: int = 100  # Items buffered between pipeline stages
+    SCRAPER_WRITE_BATCH_SIZE: int = 50  # Listings written per DB transaction
+    SCRAPER_WRITE_FLUSH_SECONDS: float = 5.0
+    SCRAPER_MAX_PAGES: int = 50  # Upper bound on listing pages per run
+    SCRAPER_EARLY_STOP: bool = False
+    SCRAPER_DELTA_MODE: bool = False  # Skip detail fetches for unchanged listing cards
+    SCRAPER_RESUME_ON_STARTUP: bool = True  # Continue a scrape run cut off by a restart
+    SCRAPER_WORKERS: int = 1  # Processes sharing a crawl; they split the request rate
+    SCRAPER_LEASE_SECONDS: int = 300  # How long a claimed job is reserved for its worker
+    SCRAPER_JOB_MAX_ATTEMPTS: int = 3  # Expired leases before a job is given up
+    SCRAPER_JOB_POLL_SECONDS: float = 2.0
+    SCRAPER_ARCHIVE_ENABLED: bool = True
+    SCRAPER_ARCHIVE_DIR: str = "./archive"
+    SCRAPER_MIRROR_ASSETS: bool = False  # Download listing images and PDFs after each scrape
+    SCRAPER_ASSET_DIR: str = "./assets"
+    SCRAPER_ASSET_CONCURRENCY: int = 4
+    SCRAPER_ASSET_MAX_BYTES: int = 50 * 1024 * 1024
     DAILY_SCRAPE_HOUR: int = 3
+    REFRESH_INTERVAL_MINUTES: int = 5  # 0 disables the priority refresh
+    REFRESH_BUDGET: int = 60  # Detail requests per refresh tick
+    REFRESH_MAX_INTERVAL_HOURS: float = 72.0
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
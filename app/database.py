@@ -1,18 +1,87 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
 
 # Handle SQLite vs PostgreSQL differences
+is_sqlite = settings.DATABASE_URL.startswith("sqlite")
 connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
+if is_sqlite:
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args=connect_args
-)
+# SQLite production profile: the database in WAL mode, so API reads never
+# wait on the scraper's commits (or make them wait), plus read-only
+# connections for the API next to the scraper's write connection. Not for
+# :memory: databases, which are private to each connection.
+sqlite_production = is_sqlite and settings.SQLITE_PRODUCTION_MODE and ":memory:" not in settings.DATABASE_URL
+
+
+def _sqlite_pragmas(read_only: bool):
+    def on_connect(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            # Stored in the database file; later connections, readers and
+            # other processes included, open it in WAL mode too
+            cursor.execute("PRAGMA journal_mode = WAL")
+        # WAL + NORMAL is safe against corruption; a power cut can only lose
+        # the last commits
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_MB * 1024}")  # Negative = KiB
+        cursor.execute(f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+    return on_connect
+
+
+if sqlite_production:
+    # One long-lived connection for the scraper's writes. Overflow
+    # connections cover the rare concurrent writer (a refresh during the
+    # daily crawl, an API write); SQLite still lets only one of them write
+    # at a time, and busy_timeout makes the others wait instead of failing.
+    engine = create_engine(settings.DATABASE_URL, connect_args=connect_args, pool_size=1, max_overflow=4)
+    event.listen(engine, "connect", _sqlite_pragmas(read_only=False))
+else:
+    engine = create_engine(
+        settings.DATABASE_URL, connect_args=connect_args
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+# Async drivers for the API's read endpoints, so a request waiting on the
+# database doesn't hold a threadpool slot. The scraper and Alembic stay on
+# the sync engine above.
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend in _ASYNC_DRIVERS:
+        return url.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+    if url.get_dialect().is_async:
+        # Already names an async driver, e.g. mysql+aiomysql
+        return url.render_as_string(hide_password=False)
+    raise ValueError(
+        f"No async driver known for '{backend}' databases; set DATABASE_ASYNC_URL to this "
+        f"database's URL with an async driver (e.g. {backend}+<driver>://...)"
+    )
+
+
+# :memory: gets a single shared connection (StaticPool), which takes no size
+pool_args = {} if ":memory:" in settings.DATABASE_URL else {"pool_size": settings.DATABASE_READ_POOL_SIZE, "max_overflow": 10}
+async_engine = create_async_engine(async_database_url(settings.DATABASE_URL), **pool_args)
+if sqlite_production:
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas(read_only=True))
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -21,3 +90,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,9 +1,12 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from app.database import engine, Base
+from app.database import engine, async_engine, Base
 from app.routers import listings
 from app.utils.logger import setup_logging
 from app.tasks.scheduler import start_scheduler, scheduler
+from app.scraper.parser_pool import shutdown_parser_pool
+from app.scraper.http_client import close_http_client
+from app.utils.cache import close_response_cache
 
 setup_logging()
 
@@ -15,6 +18,10 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     scheduler.shutdown()
+    shutdown_parser_pool()
+    await close_http_client()
+    await close_response_cache()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="ANABI Scraper API",
@@ -24,10 +31,11 @@ app = FastAPI(
 )
 
 from fastapi.staticfiles import StaticFiles
-from app.routers import listings, subscriptions
+from app.routers import listings, subscriptions, assets
 
 app.include_router(listings.router)
 app.include_router(subscriptions.router)
+app.include_router(assets.router)
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
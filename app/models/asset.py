@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Asset(Base):
+    __tablename__ = "assets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, index=True)  # Remote image/document URL
+    sha256 = Column(String(64), index=True)  # Name of the stored file; shared by identical files
+    content_type = Column(String, nullable=True)
+    size = Column(Integer, nullable=True)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now())
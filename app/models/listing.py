@@ -1,6 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean, ForeignKey, Index, Numeric
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from app.database import Base
+from app.utils.search import install_search_index
+
+# SQLite fills created_at with CURRENT_TIMESTAMP ("2026-03-01 12:00:00"). Bound
+# values have to look the same, or comparing them with stored ones (cursor
+# pagination on sort=created) goes wrong at equal seconds.
+_CURRENT_TIMESTAMP = sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d")
 
 class Listing(Base):
     __tablename__ = "listings"
@@ -16,11 +23,19 @@ class Listing(Base):
     starting_price = Column(String, nullable=True)
     current_offer = Column(String, nullable=True)
     guarantee_amount = Column(String, nullable=True)  # Guarantee/deposit amount
+
+    # Parsed from the strings above at scrape time (see price_columns in
+    # app/scraper/detail_scraper.py), for filtering and sorting in SQL
+    starting_price_value = Column(Numeric(14, 2, asdecimal=False), nullable=True)
+    current_offer_value = Column(Numeric(14, 2, asdecimal=False), nullable=True)
+    guarantee_amount_value = Column(Numeric(14, 2, asdecimal=False), nullable=True)
+    price_value = Column(Numeric(14, 2, asdecimal=False), nullable=True, index=True)  # Current offer, else starting price
+    currency = Column(String(3), nullable=True)  # RON, EUR, USD
     
     bid_count = Column(Integer, nullable=True, default=0)  # Number of bids
     
     auction_start_date = Column(DateTime, nullable=True)
-    auction_end_date = Column(DateTime, nullable=True)
+    auction_end_date = Column(DateTime, nullable=True, index=True)  # Sort key for sort=end
     registration_deadline = Column(DateTime, nullable=True)
     viewing_deadline = Column(DateTime, nullable=True)  # Deadline for viewing the item
     
@@ -37,14 +52,46 @@ class Listing(Base):
     
     images = Column(JSON, nullable=True)  # List of image URLs
     documents = Column(JSON, nullable=True)  # List of document URLs
+    mirrored_assets = Column(JSON, nullable=True)  # Remote image/document URL -> local /assets/<sha256> URL
     
     detail_url = Column(String, unique=True, index=True)
     number_of_images = Column(Integer, default=0)
     
     # Tracking fields
     scrape_errors = Column(Text, nullable=True)  # Track any scraping errors
+    content_hash = Column(String(64), nullable=True)  # sha256 of normalized detail HTML
+    summary_hash = Column(String(64), nullable=True)  # sha256 of the listing-page card summary
+    etag = Column(String, nullable=True)  # Validators for conditional GETs
+    last_modified = Column(String, nullable=True)
+
+    # Refresh scheduling (see app/tasks/priority.py)
+    last_checked_at = Column(DateTime, nullable=True)
+    last_changed_at = Column(DateTime, nullable=True)
+    refresh_interval = Column(Integer, nullable=True)  # Seconds between checks
+    next_refresh_at = Column(DateTime, nullable=True, index=True)
     is_active = Column(Boolean, default=True, index=True)  # Is listing active?
     is_sold = Column(Boolean, default=False, index=True)  # Was item sold?
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True).with_variant(_CURRENT_TIMESTAMP, "sqlite"), server_default=func.now(), index=True)
+    # Set by the scraper when a listing's data changes, not on every write
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+
+# Full-text index (FTS5 / tsvector) created with the table, see app/utils/search.py
+install_search_index(Listing.__table__)
+
+
+# What one check of a listing changed, as field -> [old, new] for the changed
+# fields only. Unchanged checks add nothing, so the table grows with the number
+# of real changes (bids, prices, status), not with the number of runs.
+class ListingChange(Base):
+    __tablename__ = "listing_changes"
+    __table_args__ = (
+        Index("ix_listing_changes_listing_time", "listing_id", "changed_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), nullable=False)
+    run_id = Column(Integer, ForeignKey("scrape_runs.id", ondelete="SET NULL"), nullable=True)  # None for refreshes
+    changed_at = Column(DateTime, nullable=False)
+    changes = Column(JSON, nullable=False)
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ScrapeRun(Base):
+    __tablename__ = "scrape_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, index=True, default="running")  # running, completed, aborted
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Discovery cursor: listing pages up to last_page are already queued
+    last_page = Column(Integer, nullable=False, default=0)
+    total_pages = Column(Integer, nullable=True)
+    discovery_done = Column(Boolean, nullable=False, default=False)
+
+    stats = Column(JSON, nullable=True)  # new/updated/unchanged/skipped/errors
+
+    # host:pid:token of the run() call working on it, cleared when it ends;
+    # see app/tasks/job_queue.py
+    owner = Column(String, nullable=True)
+
+
+class CrawlJob(Base):
+    __tablename__ = "crawl_jobs"
+    __table_args__ = (
+        UniqueConstraint("run_id", "detail_url", name="uq_crawl_jobs_run_url"),
+        Index("ix_crawl_jobs_claim", "run_id", "status", "lease_expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("scrape_runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    detail_url = Column(String, nullable=False)
+    category = Column(String, nullable=True)
+    summary_hash = Column(String(64), nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending, done, skipped, error
+
+    # Work queue lease, see app/tasks/job_queue.py
+    lease_owner = Column(String, nullable=True)  # host:pid:token of the worker
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)  # Times the job was claimed
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
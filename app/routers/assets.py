@@ -0,0 +1,32 @@
+import os
+import re
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import get_async_db
+from app.models.asset import Asset
+from app.scraper.asset_mirror import asset_path
+
+router = APIRouter(prefix="/assets", tags=["assets"])
+
+SHA256_RE = re.compile(r"[0-9a-f]{64}")
+
+# A stored file never changes: its name is the hash of its content
+CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+@router.get("/{sha256}")
+async def get_asset(sha256: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    if not SHA256_RE.fullmatch(sha256):
+        raise HTTPException(status_code=404, detail="Asset not found")
+    asset = (await db.execute(select(Asset.content_type).where(Asset.sha256 == sha256).limit(1))).first()
+    path = asset_path(settings.SCRAPER_ASSET_DIR, sha256)
+    if not asset or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    etag = f'"{sha256}"'
+    headers = {**CACHE_HEADERS, "ETag": etag}
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=asset.content_type, headers=headers)
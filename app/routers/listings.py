@@ -1,60 +1,329 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.database import get_db
-from app.models.listing import Listing
-from app.schemas.listing import ListingResponse, ListingFilter
+from typing import List, Literal, Optional, Union
+from urllib.parse import urlencode
+import orjson
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine, get_db, get_async_db
+from app.models.listing import Listing, ListingChange
+from app.models.scrape_run import ScrapeRun
+from app.schemas.listing import ListingResponse, ListingSummary, ListingChangeResponse, ListingFilter
 from app.scraper.orchestrator import ScraperOrchestrator
+from app.tasks.job_queue import run_in_progress
+from app.utils.cache import cached_json, negotiate_encoding
+from app.utils.export import ExportUnavailable, StreamCompressor, create_writer
+from app.utils.history import listing_as_of
+from app.utils.pagination import SORTS, InvalidCursor, decode_cursor, encode_cursor, keyset_queries
+from app.utils.search import apply_search
 
 router = APIRouter(prefix="/listings", tags=["listings"])
 
-@router.get("/", response_model=List[ListingResponse])
-def get_listings(
+_listing_json = TypeAdapter(ListingResponse)
+
+# List responses are read as plain rows of just the columns they show and
+# serialized straight to JSON, with no ORM objects or model validation per row
+_FULL_COLUMNS = {name: getattr(Listing, name) for name in ListingResponse.model_fields}
+
+def _first_image(dialect: str):
+    # The first image's local copy (/assets/<sha256>) once it is mirrored,
+    # its remote URL until then
+    first = Listing.images[0].as_string()
+    if dialect == "sqlite":
+        mirrored = func.json_extract(Listing.mirrored_assets, literal('$."') + first + literal('"'))
+    elif dialect == "postgresql":
+        mirrored = Listing.mirrored_assets.op("->>")(first)
+    else:
+        return first
+    return func.coalesce(mirrored, first)
+
+def _summary_columns(dialect: str) -> dict:
+    return {
+        **{name: getattr(Listing, name) for name in ListingSummary.model_fields if name not in ("image", "excerpt")},
+        # Computed in the database, so the image lists, asset maps and long
+        # descriptions are never loaded
+        "image": _first_image(dialect),
+        "excerpt": func.substr(Listing.description, 1, 200),
+    }
+
+def _list_columns(filter: ListingFilter, dialect: str) -> dict:
+    if not filter.fields:
+        if filter.view == "summary":
+            return _summary_columns(dialect)
+        return _FULL_COLUMNS
+    names = [name.strip() for name in filter.fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in _FULL_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # id always comes along, to link to the listing
+    return {name: _FULL_COLUMNS[name] for name in ["id", *names]}
+
+@router.get("/", response_model=List[Union[ListingResponse, ListingSummary]])
+async def get_listings(
+    request: Request,
     filter: ListingFilter = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(Listing)
-    
+    # Cached under the filter's values, so parameter order, defaults spelled
+    # out and unknown parameters all share one entry
+    async def render():
+        headers = {}
+        columns = _list_columns(filter, db.bind.dialect.name)
+        rows = await _find_listings(request, filter, db, headers, columns)
+        return orjson.dumps([dict(zip(columns, row)) for row in rows], option=orjson.OPT_UTC_Z), headers
+    return await cached_json(request, "listings:" + filter.model_dump_json(exclude_defaults=True), render)
+
+async def _find_listings(request: Request, filter: ListingFilter, db: AsyncSession, headers: dict, columns: dict) -> list:
+    """Rows of `columns`, in that order, for one page of the filtered listings."""
+    # Plus what a cursor is made of, after the requested columns
+    sort = filter.sort or (None if filter.search else "id")
+    extra = {"id", SORTS[sort][0]} - columns.keys() if sort else set()
+    query = select(*(column.label(name) for name, column in columns.items()), *(getattr(Listing, name) for name in sorted(extra)))
+    # Relevance order for searches unless a sort was asked for; it has no key
+    # to continue from, so ranked results page by offset only
+    query = _filter_listings(query, filter, db.bind.dialect.name, rank=sort is None)
+
+    if filter.count:
+        limit = settings.LISTINGS_COUNT_LIMIT
+        matches = query.with_only_columns(Listing.id).order_by(None).limit(limit + 1).subquery()
+        total = await db.scalar(select(func.count()).select_from(matches))
+        headers["X-Total-Count"] = str(min(total, limit))
+        if total > limit:
+            headers["X-Total-Count-Capped"] = "true"
+
+    # One row more than asked for tells whether there is a next page
+    size = filter.page_size
+    if filter.cursor and sort:
+        try:
+            position = decode_cursor(filter.cursor, sort, Listing)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        listings = []
+        for segment in keyset_queries(query, Listing, sort, position):
+            listings += (await db.execute(segment.limit(size + 1 - len(listings)))).all()
+            if len(listings) > size:
+                break
+        more = len(listings) > size
+        listings = listings[:size]
+        if position["forward"]:
+            has_next, has_prev = more, True
+        else:
+            listings.reverse()
+            has_next, has_prev = True, more
+    elif filter.cursor:
+        raise HTTPException(status_code=400, detail="Cursors need a sort; relevance-ranked results page by offset")
+    else:
+        # Page numbers: an OFFSET, so deeper pages cost more; the cursors
+        # returned with any page continue from it by key instead
+        if sort:
+            name, descending = SORTS[sort]
+            key = getattr(Listing, name)
+            query = query.order_by(key.desc().nullslast() if descending else key.asc().nullslast())
+            if name != "id":
+                query = query.order_by(Listing.id.desc() if descending else Listing.id.asc())
+        skip = (filter.page - 1) * size
+        listings = (await db.execute(query.offset(skip).limit(size + 1))).all()
+        has_next, has_prev = len(listings) > size, filter.page > 1
+        listings = listings[:size]
+
+    if sort and listings:
+        links = []
+        if has_next:
+            cursor = encode_cursor(sort, listings[-1], forward=True)
+            headers["X-Next-Cursor"] = cursor
+            links.append(f'<{_page_link(request, filter, cursor=cursor)}>; rel="next"')
+        if has_prev:
+            cursor = encode_cursor(sort, listings[0], forward=False)
+            headers["X-Prev-Cursor"] = cursor
+            links.append(f'<{_page_link(request, filter, cursor=cursor)}>; rel="prev"')
+        if links:
+            headers["Link"] = ", ".join(links)
+    elif not sort:
+        # Relevance-ranked results have no key to continue from: the links
+        # point to page numbers instead
+        links = []
+        if has_next:
+            headers["X-Next-Page"] = str(filter.page + 1)
+            links.append(f'<{_page_link(request, filter, page=filter.page + 1)}>; rel="next"')
+        if has_prev:
+            headers["X-Prev-Page"] = str(filter.page - 1)
+            links.append(f'<{_page_link(request, filter, page=filter.page - 1)}>; rel="prev"')
+        if links:
+            headers["Link"] = ", ".join(links)
+    return listings
+
+def _page_link(request: Request, filter: ListingFilter, **position) -> str:
+    # The headers are cached with the body and sent to everyone asking for
+    # the same filter, so the link is relative and built from the filter's
+    # values: nothing of the first request's Host or extra parameters
+    params = filter.model_dump(exclude_defaults=True, exclude={"page", "cursor"})
+    params = {name: str(value).lower() if isinstance(value, bool) else value for name, value in params.items()}
+    return f"{request.url.path}?{urlencode({**params, **position})}"
+
+def _filter_listings(query, filter: ListingFilter, dialect: str, rank: bool):
     if filter.category:
-        query = query.filter(Listing.category == filter.category)
+        query = query.where(Listing.category == filter.category)
     if filter.status:
-        query = query.filter(Listing.status == filter.status)
+        query = query.where(Listing.status == filter.status)
     if filter.auction_status:
-        query = query.filter(Listing.auction_status == filter.auction_status)
+        query = query.where(Listing.auction_status == filter.auction_status)
     if filter.is_active is not None:
-        query = query.filter(Listing.is_active == filter.is_active)
+        query = query.where(Listing.is_active == filter.is_active)
     if filter.is_sold is not None:
-        query = query.filter(Listing.is_sold == filter.is_sold)
+        query = query.where(Listing.is_sold == filter.is_sold)
     if filter.county:
-        query = query.filter(Listing.county == filter.county)
+        query = query.where(Listing.county == filter.county)
     if filter.city:
-        query = query.filter(Listing.city == filter.city)
+        query = query.where(Listing.city == filter.city)
+    if filter.min_price is not None:
+        query = query.where(Listing.price_value >= filter.min_price)
+    if filter.max_price is not None:
+        query = query.where(Listing.price_value <= filter.max_price)
     if filter.search:
-        search_terms = filter.search.strip().split()
-        for term in search_terms:
-            term_pattern = f"%{term}%"
-            query = query.filter(
-                (Listing.title.ilike(term_pattern)) | 
-                (Listing.description.ilike(term_pattern)) |
-                (Listing.category.ilike(term_pattern)) |
-                (Listing.county.ilike(term_pattern)) |
-                (Listing.city.ilike(term_pattern))
-            )
-        
-    # Pagination
-    skip = (filter.page - 1) * filter.page_size
-    listings = query.offset(skip).limit(filter.page_size).all()
-    return listings
+        # Every term as a word prefix, diacritics ignored
+        query = apply_search(query, Listing, filter.search, dialect, rank=rank)
+    return query
+
+@router.get("/export")
+async def export_listings(
+    request: Request,
+    filter: ListingFilter = Depends(),
+    format: Literal["ndjson", "csv", "parquet"] = Query("ndjson"),
+    after_id: Optional[int] = Query(None, description="Resume an interrupted export after the last id it delivered"),
+):
+    # Every matching listing, streamed in id order: batches come off a
+    # server-side cursor and go out as soon as they're written, so memory
+    # stays flat however many rows match. The id order is also the resume
+    # point: the last id received is the keyset cursor to continue from.
+    if filter.sort or filter.cursor:
+        raise HTTPException(status_code=400, detail="Exports are in id order; resume one with after_id")
+    columns = _list_columns(filter, async_engine.dialect.name)
+    try:
+        writer = create_writer(format, columns)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    query = select(*(column.label(name) for name, column in columns.items()))
+    query = _filter_listings(query, filter, async_engine.dialect.name, rank=False)
+    if after_id is not None:
+        query = query.where(Listing.id > after_id)
+    query = query.order_by(Listing.id).execution_options(yield_per=settings.LISTINGS_EXPORT_BATCH_SIZE)
+
+    # Parquet is compressed inside the file; the text formats on the wire
+    encoding = None
+    if format != "parquet":
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    compressor = StreamCompressor(encoding) if encoding else None
+
+    async def stream():
+        # A session of its own: the response outlives the request's dependencies
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query)
+            async for rows in result.partitions():
+                data = writer.write(rows)
+                if compressor:
+                    data = compressor.compress(data)
+                if data:
+                    yield data
+        data = writer.close()
+        if compressor:
+            data = compressor.compress(data) + compressor.finish()
+        if data:
+            yield data
+
+    headers = {"Content-Disposition": f'attachment; filename="listings.{writer.extension}"', "Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(stream(), media_type=writer.media_type, headers=headers)
 
 @router.get("/{listing_id}", response_model=ListingResponse)
-def get_listing(listing_id: int, db: Session = Depends(get_db)):
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
+async def get_listing(listing_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def render():
+        listing = await db.get(Listing, listing_id)
+        if not listing:
+            raise HTTPException(status_code=404, detail="Listing not found")
+        return _listing_json.dump_json(_listing_json.validate_python(listing, from_attributes=True)), {}
+    return await cached_json(request, f"listing:{listing_id}", render)
+
+@router.get("/{listing_id}/history", response_model=List[ListingChangeResponse])
+async def get_listing_history(
+    listing_id: int,
+    field: Optional[str] = Query(None, description="Only changes to this field, e.g. current_offer"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not await db.scalar(select(select(Listing.id).where(Listing.id == listing_id).exists())):
+        raise HTTPException(status_code=404, detail="Listing not found")
+    changes = (await db.scalars(
+        select(ListingChange).where(ListingChange.listing_id == listing_id)
+        .order_by(ListingChange.changed_at, ListingChange.id)
+    )).all()
+    if field:
+        changes = [
+            ListingChangeResponse(changed_at=change.changed_at, run_id=change.run_id, changes={field: change.changes[field]})
+            for change in changes if field in change.changes
+        ]
+    return changes
+
+@router.get("/{listing_id}/as-of", response_model=ListingResponse)
+async def get_listing_as_of(
+    listing_id: int,
+    at: datetime = Query(..., description="Point in time, e.g. 2026-03-01T12:00:00"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # The listing as it was at `at`: its current values with every later
+    # change undone
+    listing = await db.get(Listing, listing_id)
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    return listing
+    # Change times are naive local time, like the scraper's other timestamps
+    at = _local_naive(at)
+    if listing.created_at is not None and _local_naive(listing.created_at) > at:
+        raise HTTPException(status_code=404, detail="Listing was not scraped yet at that time")
+    later_changes = (await db.scalars(
+        select(ListingChange).where(ListingChange.listing_id == listing_id, ListingChange.changed_at > at)
+        .order_by(ListingChange.changed_at.desc(), ListingChange.id.desc())
+    )).all()
+    current = {column.key: getattr(listing, column.key) for column in Listing.__table__.columns}
+    return ListingResponse.model_validate({**current, **listing_as_of(listing, later_changes)})
+
+def _local_naive(value: datetime) -> datetime:
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
 
 @router.post("/scrape")
 async def trigger_scrape(background_tasks: BackgroundTasks):
     orchestrator = ScraperOrchestrator()
     background_tasks.add_task(orchestrator.run)
     return {"message": "Scraping started in background"}
+
+@router.post("/scrape/{run_id}/resume")
+def resume_scrape(run_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    # Continues an interrupted run without re-fetching what it already fetched
+    run = db.get(ScrapeRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Scrape run not found")
+    if run.status == "completed":
+        raise HTTPException(status_code=409, detail="Scrape run already completed")
+    if run_in_progress(db, run):
+        raise HTTPException(status_code=409, detail="Scrape run is still in progress")
+    orchestrator = ScraperOrchestrator()
+    background_tasks.add_task(orchestrator.run, run_id)
+    return {"message": f"Resuming scrape run {run_id} in background"}
+
+@router.post("/reparse")
+def trigger_reparse(background_tasks: BackgroundTasks):
+    # Re-extracts every listing from the raw HTML archive; no requests are sent
+    orchestrator = ScraperOrchestrator()
+    background_tasks.add_task(orchestrator.replay)
+    return {"message": "Re-parse from archive started in background"}
+
+@router.post("/mirror-assets")
+def trigger_asset_mirroring(background_tasks: BackgroundTasks):
+    # Backfill: copies the images and documents of every listing; files
+    # already stored are skipped
+    orchestrator = ScraperOrchestrator()
+    background_tasks.add_task(orchestrator.mirror_assets)
+    return {"message": "Asset mirroring started in background"}
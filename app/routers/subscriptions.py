@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.subscription import Subscription
 from app.schemas.subscription import SubscriptionCreate, SubscriptionResponse
 
@@ -24,11 +26,11 @@ def create_subscription(subscription: SubscriptionCreate, db: Session = Depends(
     return db_subscription
 
 @router.get("/", response_model=List[SubscriptionResponse])
-def get_subscriptions(email: Optional[str] = None, db: Session = Depends(get_db)):
-    query = db.query(Subscription)
+async def get_subscriptions(email: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    query = select(Subscription)
     if email:
-        query = query.filter(Subscription.email == email)
-    return query.all()
+        query = query.where(Subscription.email == email)
+    return (await db.scalars(query)).all()
 
 @router.delete("/{subscription_id}")
 def delete_subscription(subscription_id: int, db: Session = Depends(get_db)):
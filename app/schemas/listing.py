@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List, Optional, Any
+from typing import Dict, List, Literal, Optional, Any
 
 class ListingBase(BaseModel):
     title: str
@@ -11,6 +11,11 @@ class ListingBase(BaseModel):
     starting_price: Optional[str] = None  # Changed to string due to inconsistent formats
     current_offer: Optional[str] = None  # Changed to string due to inconsistent formats
     guarantee_amount: Optional[str] = None
+    starting_price_value: Optional[float] = None
+    current_offer_value: Optional[float] = None
+    guarantee_amount_value: Optional[float] = None
+    price_value: Optional[float] = None  # Current offer, else starting price
+    currency: Optional[str] = None
     bid_count: Optional[int] = 0
     auction_start_date: Optional[datetime] = None
     auction_end_date: Optional[datetime] = None
@@ -26,6 +31,7 @@ class ListingBase(BaseModel):
     observations: Optional[str] = None
     images: Optional[List[str]] = []
     documents: Optional[List[Any]] = []
+    mirrored_assets: Optional[Dict[str, str]] = None  # Local copies, by remote URL
     detail_url: str
     number_of_images: Optional[int] = 0
     scrape_errors: Optional[str] = None
@@ -43,6 +49,32 @@ class ListingResponse(ListingBase):
     class Config:
         from_attributes = True
 
+# What a card in the listings grid shows; GET /listings/?view=summary
+class ListingSummary(BaseModel):
+    id: int
+    title: str
+    category: Optional[str] = None
+    status: Optional[str] = None
+    auction_status: Optional[str] = None
+    starting_price: Optional[str] = None
+    current_offer: Optional[str] = None
+    price_value: Optional[float] = None
+    currency: Optional[str] = None
+    auction_start_date: Optional[datetime] = None
+    auction_end_date: Optional[datetime] = None
+    county: Optional[str] = None
+    city: Optional[str] = None
+    image: Optional[str] = None  # First of images, as its /assets/ copy once mirrored
+    excerpt: Optional[str] = None  # Start of the description
+
+class ListingChangeResponse(BaseModel):
+    changed_at: datetime
+    run_id: Optional[int] = None
+    changes: Dict[str, List[Any]]  # field -> [old, new]
+
+    class Config:
+        from_attributes = True
+
 class ListingFilter(BaseModel):
     category: Optional[str] = None
     status: Optional[str] = None
@@ -52,5 +84,13 @@ class ListingFilter(BaseModel):
     county: Optional[str] = None
     city: Optional[str] = None
     search: Optional[str] = None
+    min_price: Optional[float] = None  # On price_value
+    max_price: Optional[float] = None
+    # Unset: by id, or by relevance with search
+    sort: Optional[Literal["id", "-id", "created", "-created", "end", "-end", "price", "-price"]] = None
+    cursor: Optional[str] = None  # From X-Next-Cursor / X-Prev-Cursor; replaces page
     page: int = 1
     page_size: int = 20
+    count: bool = False  # Adds X-Total-Count, capped at LISTINGS_COUNT_LIMIT
+    view: Literal["full", "summary"] = "full"
+    fields: Optional[str] = None  # Comma-separated ListingResponse fields; overrides view
@@ -0,0 +1,118 @@
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Not on Windows, where only one process may append at a time
+
+
+class PageArchive:
+    """Append-only archive of every page the scrapers fetch.
+
+    Pages are appended to numbered segment files (segment-00001.gz, ...) as
+    independent gzip members, so any record can be decompressed on its own from
+    its offset. Each member starts with a one-line JSON header (url, kind,
+    fetched_at) followed by the raw HTML, which keeps segments self-describing
+    like WARC records. index.jsonl maps every record to its segment, offset
+    and length.
+
+    Crawl worker processes on one host share the directory; appends take an
+    exclusive lock on it, so offsets and index lines never interleave.
+    """
+
+    INDEX_FILE = "index.jsonl"
+    LOCK_FILE = "archive.lock"
+
+    def __init__(self, root: str, segment_size: int = 64 * 1024 * 1024):
+        self.root = root
+        self.segment_size = segment_size
+        os.makedirs(root, exist_ok=True)
+        self._segment = self._last_segment()
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.root, f"segment-{number:05d}.gz")
+
+    def _last_segment(self) -> int:
+        numbers = [
+            int(name[len("segment-"):-len(".gz")])
+            for name in os.listdir(self.root)
+            if name.startswith("segment-") and name.endswith(".gz")
+        ]
+        return max(numbers, default=1)
+
+    def append(self, url: str, kind: str, html: str) -> Dict[str, Any]:
+        """Store one fetched page and return its index entry."""
+        fetched_at = datetime.now().isoformat()
+        header = json.dumps({"url": url, "kind": kind, "fetched_at": fetched_at}, ensure_ascii=False)
+        record = gzip.compress(f"{header}\n{html}".encode("utf-8"))
+
+        with self._locked():
+            # Another process may have started a newer segment meanwhile
+            self._segment = self._last_segment()
+            path = self._segment_path(self._segment)
+            if os.path.exists(path) and os.path.getsize(path) + len(record) > self.segment_size:
+                self._segment += 1
+                path = self._segment_path(self._segment)
+
+            with open(path, "ab") as segment:
+                offset = segment.tell()
+                segment.write(record)
+
+            entry = {
+                "url": url,
+                "kind": kind,
+                "fetched_at": fetched_at,
+                "segment": self._segment,
+                "offset": offset,
+                "length": len(record),
+            }
+            with open(os.path.join(self.root, self.INDEX_FILE), "a", encoding="utf-8") as index:
+                index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.root, self.LOCK_FILE), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)  # Released when the file closes
+            yield
+
+    def read(self, entry: Dict[str, Any]) -> str:
+        with open(self._segment_path(entry["segment"]), "rb") as segment:
+            segment.seek(entry["offset"])
+            record = gzip.decompress(segment.read(entry["length"])).decode("utf-8")
+        _header, _, html = record.partition("\n")
+        return html
+
+    def entries(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        index_path = os.path.join(self.root, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return []
+        entries = []
+        with open(index_path, encoding="utf-8") as index:
+            for line in index:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if kind is None or entry["kind"] == kind:
+                    entries.append(entry)
+        return entries
+
+    def iter_latest(self, kind: Optional[str] = None) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """Yield (entry, html) for the most recent capture of each URL."""
+        latest: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries(kind):
+            latest[entry["url"]] = entry  # Index is append-only, so later wins
+        for entry in latest.values():
+            try:
+                yield entry, self.read(entry)
+            except (OSError, EOFError, gzip.BadGzipFile) as e:
+                logger.error(f"Could not read archived page {entry['url']}: {e}")
@@ -0,0 +1,69 @@
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.scraper.base import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+
+class AssetTooLargeError(Exception):
+    pass
+
+
+def asset_path(root: str, sha256: str) -> str:
+    return os.path.join(root, sha256[:2], sha256[2:4], sha256)
+
+
+class AssetMirror(BaseScraper):
+    """Downloads listing images and documents into a content-addressed store.
+
+    Each file is streamed to disk in chunks while being hashed, then moved to
+    <root>/ab/cd/<sha256>. Identical files (the same photo on a relisted
+    item) end up stored once, whatever URL they came from.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, root: str):
+        super().__init__()
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    async def download(self, url: str) -> Optional[Dict[str, Any]]:
+        """Store the file at `url`; returns its sha256, size and content type."""
+        response = await self.fetch_response(url, stream=True)
+        if response is None:
+            return None
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > settings.SCRAPER_ASSET_MAX_BYTES:
+                        raise AssetTooLargeError(f"{url} is larger than {settings.SCRAPER_ASSET_MAX_BYTES} bytes")
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            sha256 = digest.hexdigest()
+            path = asset_path(self.root, sha256)
+            if os.path.exists(path):
+                # Same bytes already stored under another URL
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        finally:
+            await response.aclose()
+
+        content_type = response.headers.get("Content-Type", "application/octet-stream").split(";")[0].strip()
+        return {"url": url, "sha256": sha256, "size": size, "content_type": content_type}
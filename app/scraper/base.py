@@ -1,34 +1,141 @@
+import asyncio
 import httpx
 import logging
-import asyncio
-from bs4 import BeautifulSoup
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
 from app.config import settings
-from typing import Optional
+from app.scraper.archive import PageArchive
+from app.scraper.circuit_breaker import get_breaker
+from app.scraper.http_client import get_http_client
+from app.scraper.rate_limiter import get_limiter
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    # Full jitter: uniform in [0, base * 2^attempt], capped; the server's
+    # Retry-After wins when it asks for longer
+    delay = random.uniform(0, min(settings.SCRAPER_BACKOFF_MAX, settings.SCRAPER_BACKOFF_BASE * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, settings.SCRAPER_BACKOFF_MAX))
+    return delay
+
+
+@lru_cache(maxsize=None)
+def resolve_parser(name: str) -> str:
+    """Return `name` if BeautifulSoup can use it, else the built-in html.parser.
+
+    "lxml" (C-backed, several times faster) and "html5lib" are optional installs.
+    """
+    try:
+        BeautifulSoup("", name)
+        return name
+    except FeatureNotFound:
+        logger.warning(f"HTML parser '{name}' is not installed, falling back to html.parser")
+        return "html.parser"
+
+
 class BaseScraper:
-    def __init__(self):
-        self.headers = {
-            "User-Agent": settings.SCRAPER_USER_AGENT
-        }
-        self.client = httpx.AsyncClient(headers=self.headers, timeout=30.0)
+    def __init__(self, archive: Optional[PageArchive] = None):
+        self.archive = archive
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return get_http_client()
+
+    async def fetch_response(self, url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False) -> Optional[httpx.Response]:
+        """GET `url`, retrying transient failures; None if it could not be fetched.
+
+        Timeouts, connection errors and 429/5xx responses are retried up to
+        SCRAPER_MAX_RETRIES times with jittered exponential backoff, honouring
+        Retry-After. Raises CircuitOpenError when the host looks down.
+
+        With stream=True the body is not read; the caller iterates it and must
+        close the response.
+        """
+        limiter = get_limiter(url)
+        breaker = get_breaker(url)
+        for attempt in range(settings.SCRAPER_MAX_RETRIES + 1):
+            breaker.check()
+            await limiter.acquire()
+            retry_after = None
+            started = time.monotonic()
+            try:
+                response = await self.client.send(self.client.build_request("GET", url, headers=headers), stream=stream)
+            except httpx.TransportError as e:
+                # Timeouts and connection failures: the host may be overloaded
+                limiter.slow_down()
+                breaker.record_failure()
+                error = f"{type(e).__name__}: {e}"
+            except Exception as e:
+                logger.error(f"Unexpected error fetching {url}: {e}")
+                return None
+            else:
+                if response.status_code in RETRY_STATUSES:
+                    await response.aclose()
+                    if response.status_code in (429, 503):
+                        limiter.slow_down()
+                    breaker.record_failure()
+                    retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                    error = f"HTTP {response.status_code}"
+                else:
+                    limiter.record_success(time.monotonic() - started)
+                    breaker.record_success()
+                    if response.status_code == 304:
+                        return response
+                    try:
+                        response.raise_for_status()
+                    except httpx.HTTPStatusError as e:
+                        # 404 and friends: retrying will not help
+                        await response.aclose()
+                        logger.error(f"Error fetching {url}: {e}")
+                        return None
+                    return response
+
+            if attempt < settings.SCRAPER_MAX_RETRIES:
+                delay = _backoff_delay(attempt, retry_after)
+                logger.warning(f"Fetching {url} failed ({error}), retry {attempt + 1}/{settings.SCRAPER_MAX_RETRIES} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        logger.error(f"Error fetching {url}: {error}, giving up after {settings.SCRAPER_MAX_RETRIES + 1} attempts")
+        return None
 
     async def fetch_page(self, url: str) -> Optional[str]:
-        try:
-            await asyncio.sleep(settings.SCRAPER_REQUEST_DELAY)
-            response = await self.client.get(url)
-            response.raise_for_status()
-            return response.text
-        except httpx.HTTPError as e:
-            logger.error(f"Error fetching {url}: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error fetching {url}: {e}")
+        response = await self.fetch_response(url)
+        if response is None:
             return None
+        return response.text
 
-    def parse_html(self, html: str) -> BeautifulSoup:
-        return BeautifulSoup(html, "html.parser")
+    def parse_html(self, html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        # parse_only limits the tree to the subtrees a scraper reads; it is only
+        # applied when SCRAPER_PARTIAL_PARSE is on
+        if not settings.SCRAPER_PARTIAL_PARSE:
+            parse_only = None
+        return BeautifulSoup(html, resolve_parser(settings.SCRAPER_HTML_PARSER), parse_only=parse_only)
 
     async def close(self):
-        await self.client.aclose()
+        # The shared client outlives any one scraper; it is closed with the app
+        # (see http_client.close_http_client)
+        pass
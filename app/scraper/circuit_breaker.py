@@ -0,0 +1,73 @@
+import logging
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host that looks down."""
+
+
+class CircuitBreaker:
+    """Stops requests to a host after too many consecutive failures.
+
+    Once `threshold` attempts in a row have failed (retries included), the
+    circuit opens and every request fails fast with CircuitOpenError. After
+    `cooldown` seconds one trial request is let through while the others keep
+    failing fast; a success closes the circuit again, a failure re-opens it.
+    """
+
+    def __init__(self, host: str, threshold: int, cooldown: float):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None  # Half-open: the trial request is out
+
+    def check(self):
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        if now - self.opened_at < self.cooldown:
+            raise CircuitOpenError(f"{self.host} is failing, requests paused")
+        # A trial that never reported back (cancelled, unexpected error) stops
+        # blocking after another cooldown, and the next caller gets to try
+        if self.trial_started_at is not None and now - self.trial_started_at < self.cooldown:
+            raise CircuitOpenError(f"{self.host} is failing, waiting on a trial request")
+        # Half-open: this caller's request is the trial
+        self.trial_started_at = now
+
+    def record_success(self):
+        if self.failures:
+            logger.info(f"{self.host} recovered, circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_started_at is not None:
+            # The trial failed: paused for another cooldown
+            self.opened_at = time.monotonic()
+            self.trial_started_at = None
+            logger.error(f"{self.host} still failing, circuit re-opened for {self.cooldown:.0f}s")
+        elif self.threshold > 0 and self.failures >= self.threshold and self.opened_at is None:
+            self.opened_at = time.monotonic()
+            logger.error(f"{self.host} failed {self.failures} requests in a row, circuit opened for {self.cooldown:.0f}s")
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for the host of `url`."""
+    host = urlsplit(url).netloc
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = CircuitBreaker(host, settings.SCRAPER_BREAKER_THRESHOLD, settings.SCRAPER_BREAKER_COOLDOWN)
+        _breakers[host] = breaker
+    return breaker
@@ -1,19 +1,240 @@
+import hashlib
 import logging
 import re
+import unicodedata
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urljoin
+from bs4 import BeautifulSoup
 from app.scraper.base import BaseScraper
+from app.scraper.parser_pool import run_parser
 
 logger = logging.getLogger(__name__)
 
+# Parts of a detail page that change on every request without the listing
+# changing: inline scripts (CSRF tokens, trackers), hidden form tokens and the
+# server-rendered countdown text.
+_VOLATILE_PATTERNS = [
+    re.compile(r"<script\b.*?</script>", re.IGNORECASE | re.DOTALL),
+    re.compile(r"<meta[^>]+csrf[^>]*>", re.IGNORECASE),
+    re.compile(r"<input[^>]+type=[\"']hidden[\"'][^>]*>", re.IGNORECASE),
+]
+# The countdown's contents go too, up to its own closing tag: it may hold
+# nested divs (days, hours, ...)
+_COUNTDOWN_OPEN = re.compile(r"<div[^>]*class=[\"'][^\"']*countdown[^\"']*[\"'][^>]*>", re.IGNORECASE)
+_DIV_TAG = re.compile(r"<(/?)div\b[^>]*>", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_AUCTION_CLOSED = re.compile("Licitatie incheiata|Licitație încheiată")
+
+# Price strings, as shown on the site, that get a numeric copy
+PRICE_FIELDS = ('starting_price', 'current_offer', 'guarantee_amount')
+_NOT_AMOUNT = re.compile(r"[^\d.,]")
+_CURRENCIES = [
+    ("RON", re.compile(r"\b(lei|ron)\b", re.IGNORECASE)),
+    ("EUR", re.compile(r"€|\b(eur|euro)\b", re.IGNORECASE)),
+    ("USD", re.compile(r"\$|\busd\b", re.IGNORECASE)),
+]
+
+
+def fold_diacritics(text: str) -> str:
+    """Lowercase and strip diacritics: "Garanție" -> "garantie"."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def parse_currency(price_str: Optional[str]) -> Optional[str]:
+    if not price_str:
+        return None
+    for code, pattern in _CURRENCIES:
+        if pattern.search(price_str):
+            return code
+    return None
+
+
+def parse_price(price_str: Optional[str]) -> Optional[float]:
+    if not price_str:
+        return None
+    # Drop currency names/symbols and ALL whitespace (including non-breaking spaces)
+    clean_str = _NOT_AMOUNT.sub("", price_str)
+    if not clean_str:
+        return None
+
+    try:
+        # Determine format based on separators
+        # Romanian: "1.200,50" (dot=thousands, comma=decimal)
+        # US: "1,200.50" (comma=thousands, dot=decimal)
+        
+        dot_count = clean_str.count('.')
+        comma_count = clean_str.count(',')
+        
+        if dot_count == 0 and comma_count == 0:
+            # Simple integer or decimal
+            return float(clean_str)
+        elif dot_count > 1:
+            # Multiple dots = Romanian thousands separator "1.234.567,89"
+            clean_str = clean_str.replace('.', '').replace(',', '.')
+        elif comma_count > 1:
+            # Multiple commas = US thousands separator "1,234,567.89"
+            clean_str = clean_str.replace(',', '')
+        elif dot_count == 1 and comma_count == 1:
+            # Both present - check which comes last
+            if clean_str.rfind(',') > clean_str.rfind('.'):
+                # Romanian: "1.200,50" -> comma is decimal
+                clean_str = clean_str.replace('.', '').replace(',', '.')
+            else:
+                # US: "1,200.50" -> dot is decimal, remove comma
+                clean_str = clean_str.replace(',', '')
+        elif len(clean_str) - max(clean_str.rfind('.'), clean_str.rfind(',')) == 4:
+            # One separator before exactly 3 digits is a thousands separator,
+            # "1.200" or "1,200": prices never have 3 decimals
+            clean_str = clean_str.replace('.', '').replace(',', '')
+        elif comma_count == 1:
+            # Only comma - European decimal "1200,50"
+            clean_str = clean_str.replace(',', '.')
+        # elif dot_count == 1: # Only dot - already correct format
+        
+        return float(clean_str)
+    except (ValueError, AttributeError) as e:
+        logger.error(f"Could not parse price '{price_str}' (cleaned: '{clean_str}'): {e}")
+        return None
+
+
+def price_columns(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Numeric columns for the price strings present in `data`.
+
+    <field>_value for each of PRICE_FIELDS, price_value (the current offer,
+    or the starting price while there is no offer) and currency.
+    """
+    columns = {}
+    currency = None
+    for field in PRICE_FIELDS:
+        if field in data:
+            columns[f"{field}_value"] = parse_price(data[field])
+            currency = currency or parse_currency(data[field])
+    if 'current_offer_value' in columns or 'starting_price_value' in columns:
+        # An offer of 0 means nobody has bid yet
+        offer = columns.get('current_offer_value') or None
+        columns['price_value'] = offer if offer is not None else columns.get('starting_price_value')
+    if currency:
+        columns['currency'] = currency
+    return columns
+
+
+def _strip_countdowns(html: str) -> str:
+    # Keeps the countdown's opening tag (its data-expire-date is real data)
+    parts = []
+    position = 0
+    while (opening := _COUNTDOWN_OPEN.search(html, position)) is not None:
+        depth = 1
+        for tag in _DIV_TAG.finditer(html, opening.end()):
+            depth += -1 if tag.group(1) else 1
+            if depth == 0:
+                break
+        if depth:
+            break  # Never closed; leave the rest as it is
+        parts.append(html[position:opening.end()])
+        parts.append("</div>")
+        position = tag.end()
+    parts.append(html[position:])
+    return "".join(parts)
+
+
+def content_hash(html: str) -> str:
+    """sha256 of the detail HTML with volatile fragments and whitespace normalized."""
+    for pattern in _VOLATILE_PATTERNS:
+        html = pattern.sub(lambda m: "".join(g for g in m.groups() if g), html)
+    html = _strip_countdowns(html)
+    html = _WHITESPACE.sub(" ", html)
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
 class DetailScraper(BaseScraper):
-    async def scrape_detail(self, url: str) -> Optional[Dict[str, Any]]:
+    async def fetch_detail(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        previous_hash: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch a detail page without parsing it.
+
+        The validators from the previous scrape are sent as a conditional GET.
+        If the server answers 304, or the normalized page hashes to
+        `previous_hash`, `{"unchanged": True}` is returned, with any fresh
+        validators. Otherwise the result holds the raw `html` plus the new
+        content_hash/etag/last_modified.
+        """
         logger.info(f"Scraping detail page: {url}")
-        html = await self.fetch_page(url)
-        if not html:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        response = await self.fetch_response(url, headers=headers or None)
+        if response is None:
             return None
+        if response.status_code == 304:
+            # A 304 may carry updated validators; keep the stored ones otherwise
+            unchanged = {"detail_url": url, "unchanged": True}
+            if response.headers.get("ETag"):
+                unchanged["etag"] = response.headers["ETag"]
+            if response.headers.get("Last-Modified"):
+                unchanged["last_modified"] = response.headers["Last-Modified"]
+            return unchanged
+
+        html = response.text
+        page_hash = content_hash(html)
+        if previous_hash and page_hash == previous_hash:
+            # The stored validators didn't get a 304, so they are stale: the
+            # next conditional GET needs these
+            return {
+                "detail_url": url,
+                "unchanged": True,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
 
+        # Only new content is archived; an unchanged page is already there
+        # from the scrape that last changed it
+        if self.archive:
+            self.archive.append(url, "detail", html)
+        return {
+            "detail_url": url,
+            "html": html,
+            "content_hash": page_hash,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    def archived_detail(self, entry: Dict[str, Any], previous_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Same result as fetch_detail, from an archived capture instead of the network."""
+        url = entry["url"]
+        html = self.archive.read(entry)
+        page_hash = content_hash(html)
+        if previous_hash and page_hash == previous_hash:
+            return {"detail_url": url, "unchanged": True}
+        return {"detail_url": url, "html": html, "content_hash": page_hash}
+
+    async def scrape_detail(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        previous_hash: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch and parse a detail page; see fetch_detail for change detection."""
+        page = await self.fetch_detail(url, etag, last_modified, previous_hash)
+        if not page or page.get('unchanged'):
+            return page
+        data = await run_parser(parse_detail_page, url, page.pop('html'))
+        data.update(page)
+        return data
+
+    def parse_detail(self, url: str, html: str) -> Dict[str, Any]:
+        # Always a full parse: the closed-auction marker and the title fallback
+        # can sit anywhere in the page, so a strainer could change the result
         soup = self.parse_html(html)
         data = {"detail_url": url}
 
@@ -24,23 +245,22 @@ class DetailScraper(BaseScraper):
         if title_elem:
             data['title'] = title_elem.get_text(strip=True)
         
-        # The page seems to have labels like "Pret de pornire:", "Oferta curenta:", etc.
-        # We can look for these labels and get the next sibling or text
-        
-        text_content = soup.get_text(separator="\n")
-        
-        # Helper to extract value by label from the specific structure
-        # Structure: <p><span class="ad-info-name">Label</span> <span class="ad-info-value">Value</span></p>
+        # The page has labels like "Pret", "Expira la", etc. Collect them all in
+        # one pass; each lookup below then scans this short list, not the tree
+        label_index = self._build_label_index(soup)
+
         def extract_by_label(label: str) -> Optional[str]:
-            # Find span with class ad-info-name containing the label
-            for span in soup.find_all('span', class_='ad-info-name'):
-                if label.lower() in span.get_text(strip=True).lower():
-                    # The value is usually in the next sibling span with class ad-info-value
-                    value_elem = span.find_next_sibling('span', class_='ad-info-value')
-                    if value_elem:
-                        return value_elem.get_text(strip=True)
+            # First label (in document order) that contains `label`, ignoring
+            # case and diacritics, so "Garantie" also matches "Garanție"
+            folded = fold_diacritics(label)
+            for name, value in label_index:
+                if folded in name:
+                    return value
             return None
 
+        # Looked up several times below
+        detail_div = soup.find('div', class_='ads-detail')
+
         # Prices - store as strings due to inconsistent formatting
         # "Pret" in Informatii generale
         price_str = extract_by_label("Pret")
@@ -63,17 +283,17 @@ class DetailScraper(BaseScraper):
                 data['current_offer'] = right_span.get_text(strip=True)
         
         # Guarantee amount - look for "Garantie" or "Garanție" label
-        guarantee_str = extract_by_label("Garantie") or extract_by_label("Garanție")
+        guarantee_str = extract_by_label("Garantie")
         if guarantee_str:
             data['guarantee_amount'] = guarantee_str.strip()
         
         # Auction type - look for "Tip licitatie" or similar
-        auction_type = extract_by_label("Tip licitatie") or extract_by_label("Tip licitație")
+        auction_type = extract_by_label("Tip licitatie")
         if auction_type:
             data['auction_type'] = auction_type.strip()
         
         # Bid count - look for number of offers/bids
-        bid_count_str = extract_by_label("Numar oferte") or extract_by_label("Număr oferte")
+        bid_count_str = extract_by_label("Numar oferte")
         if bid_count_str:
             try:
                 data['bid_count'] = int(re.sub(r'\D', '', bid_count_str))
@@ -90,7 +310,7 @@ class DetailScraper(BaseScraper):
             data['auction_end_date'] = self._parse_date(end_date_str)
             
         # Registration deadline not explicitly found in debug HTML, might be "Termen limita" if present
-        reg_deadline_str = extract_by_label("Termen limita") or extract_by_label("Termen limită")
+        reg_deadline_str = extract_by_label("Termen limita")
         if reg_deadline_str:
             data['registration_deadline'] = self._parse_date(reg_deadline_str)
         
@@ -189,7 +409,7 @@ class DetailScraper(BaseScraper):
 
         
         # If "Licitatie incheiata" text exists
-        if soup.find(string=re.compile("Licitatie incheiata")) or soup.find(string=re.compile("Licitație încheiată")):
+        if soup.find(string=_AUCTION_CLOSED):
             data['auction_status'] = 'Closed'
             data['is_active'] = False
             # If closed and not adjudecat, it means it wasn't sold
@@ -213,7 +433,6 @@ class DetailScraper(BaseScraper):
         # Description
         # Look for the description text block
         # It's usually after <div class="ads-detail">
-        detail_div = soup.find('div', class_='ads-detail')
         if detail_div:
             # Get text but exclude the table and other specific elements if needed
             # For now, just get all text
@@ -246,7 +465,7 @@ class DetailScraper(BaseScraper):
 
         # Parse Table Data (Specifications)
         specs = []
-        table = soup.find('div', class_='ads-detail').find('table') if soup.find('div', class_='ads-detail') else None
+        table = detail_div.find('table') if detail_div else None
         if table:
             for tr in table.find_all('tr'):
                 cells = tr.find_all('td')
@@ -282,49 +501,20 @@ class DetailScraper(BaseScraper):
             else:
                 data['description'] = specs_text
 
+        # Numeric copies of the prices, for filtering and sorting in SQL
+        data.update(price_columns(data))
+
         return data
 
-    def _parse_price(self, price_str: str) -> Optional[float]:
-        if not price_str:
-            return None
-        # Remove currency symbols and ALL whitespace (including non-breaking spaces)
-        clean_str = price_str.replace("RON", "").replace("LEI", "").replace("lei", "")
-        clean_str = ''.join(clean_str.split())  # Remove all whitespace
-        
-        try:
-            # Determine format based on separators
-            # Romanian: "1.200,50" (dot=thousands, comma=decimal)
-            # US: "1,200.50" (comma=thousands, dot=decimal)
-            
-            dot_count = clean_str.count('.')
-            comma_count = clean_str.count(',')
-            
-            if dot_count == 0 and comma_count == 0:
-                # Simple integer or decimal
-                return float(clean_str)
-            elif dot_count > 1:
-                # Multiple dots = Romanian thousands separator "1.234.567,89"
-                clean_str = clean_str.replace('.', '').replace(',', '.')
-            elif comma_count > 1:
-                # Multiple commas = US thousands separator "1,234,567.89"
-                clean_str = clean_str.replace(',', '')
-            elif dot_count == 1 and comma_count == 1:
-                # Both present - check which comes last
-                if clean_str.rfind(',') > clean_str.rfind('.'):
-                    # Romanian: "1.200,50" -> comma is decimal
-                    clean_str = clean_str.replace('.', '').replace(',', '.')
-                else:
-                    # US: "1,200.50" -> dot is decimal, remove comma
-                    clean_str = clean_str.replace(',', '')
-            elif comma_count == 1:
-                # Only comma - European decimal "1200,50"
-                clean_str = clean_str.replace(',', '.')
-            # elif dot_count == 1: # Only dot - already correct format
-            
-            return float(clean_str)
-        except (ValueError, AttributeError) as e:
-            logger.error(f"Could not parse price '{price_str}' (cleaned: '{clean_str}'): {e}")
-            return None
+    def _build_label_index(self, soup: BeautifulSoup) -> List[Tuple[str, str]]:
+        # Structure: <p><span class="ad-info-name">Label</span> <span class="ad-info-value">Value</span></p>
+        # Returns (folded label, value) pairs in document order
+        index = []
+        for span in soup.find_all('span', class_='ad-info-name'):
+            value_elem = span.find_next_sibling('span', class_='ad-info-value')
+            if value_elem:
+                index.append((fold_diacritics(span.get_text(strip=True)), value_elem.get_text(strip=True)))
+        return index
 
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         if not date_str:
@@ -368,3 +558,15 @@ class DetailScraper(BaseScraper):
             return None
             
         return datetime.now() + timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+# Parser pool entry point. Module-level so it pickles by reference; each worker
+# process keeps its own scraper instance for the parsing helpers.
+_worker_scraper: Optional[DetailScraper] = None
+
+
+def parse_detail_page(url: str, html: str) -> Dict[str, Any]:
+    global _worker_scraper
+    if _worker_scraper is None:
+        _worker_scraper = DetailScraper()
+    return _worker_scraper.parse_detail(url, html)
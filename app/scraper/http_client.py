@@ -0,0 +1,47 @@
+import logging
+from typing import Optional
+import httpx
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    if not settings.SCRAPER_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("SCRAPER_HTTP2 is on but the 'h2' package is not installed, using HTTP/1.1")
+        return False
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide client shared by every scraper.
+
+    Connections are kept alive between requests and across scrape runs, so
+    concurrent fetches reuse them instead of paying a TLS handshake each.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers={"User-Agent": settings.SCRAPER_USER_AGENT},
+            timeout=settings.SCRAPER_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SCRAPER_MAX_KEEPALIVE,
+                keepalive_expiry=settings.SCRAPER_KEEPALIVE_EXPIRY,
+            ),
+            http2=_http2_available(),
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,24 +1,47 @@
+import hashlib
+import json
 import logging
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, Optional, Tuple
 from urllib.parse import urljoin
+from bs4 import BeautifulSoup, SoupStrainer
 from app.scraper.base import BaseScraper
+from app.scraper.parser_pool import run_parser
 
 logger = logging.getLogger(__name__)
 
 class ListingsScraper(BaseScraper):
     BASE_URL = "https://anabi.just.ro/licitatiionline/ads"
+    # Only the listing cards and the pagination control are read from a page
+    PARSE_ONLY = SoupStrainer(attrs={"class": ["licitatie-box", "pagination"]})
 
-    async def get_total_pages(self) -> int:
-        # Logic to determine total pages, or we can just iterate until no more results
-        # For now, let's assume we iterate until we find no listings or a "next" button is disabled
-        # But to be safe, we can inspect the pagination control if it exists
-        html = await self.fetch_page(self.BASE_URL)
-        if not html:
-            return 1
-        soup = self.parse_html(html)
-        # TODO: Implement pagination logic based on actual HTML structure
-        # For now, we will just return a safe number or handle it in the loop
-        return 100 # Placeholder, better to loop until empty
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Page count read from the pagination control of the last listing page
+        self.total_pages: Optional[int] = None
+        self._first_page_scraped = False
+
+    async def get_total_pages(self) -> Optional[int]:
+        # Page 1 is fetched only if it hasn't been yet; a site without a
+        # pagination control leaves the count at None either way
+        if self.total_pages is None and not self._first_page_scraped:
+            await self.scrape_page(1)
+        return self.total_pages
+
+    def parse_total_pages(self, soup: BeautifulSoup) -> Optional[int]:
+        # <ul class="pagination"> ... <li><a href="...ads?page=57">&raquo;</a></li></ul>
+        # The highest page number linked from the control is the last page
+        pagination = soup.find('ul', class_='pagination')
+        if not pagination:
+            return None
+        pages = []
+        for a in pagination.find_all('a'):
+            match = re.search(r'[?&]page=(\d+)', a.get('href', ''))
+            if match:
+                pages.append(int(match.group(1)))
+            elif a.get_text(strip=True).isdigit():
+                pages.append(int(a.get_text(strip=True)))
+        return max(pages) if pages else None
 
     async def scrape_page(self, page: int) -> List[Dict[str, Any]]:
         url = f"{self.BASE_URL}?page={page}"
@@ -26,8 +49,20 @@ class ListingsScraper(BaseScraper):
         html = await self.fetch_page(url)
         if not html:
             return []
+        if page == 1:
+            self._first_page_scraped = True
+        if self.archive:
+            self.archive.append(url, "listing", html)
 
-        soup = self.parse_html(html)
+        listings, total_pages = await run_parser(parse_listings_page, html)
+        if total_pages:
+            self.total_pages = total_pages
+        return listings
+
+    def parse_listings(self, html: str) -> List[Dict[str, Any]]:
+        return self.extract_listings(self.parse_html(html, parse_only=self.PARSE_ONLY))
+
+    def extract_listings(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
         listings = []
         
         # Find all listing boxes
@@ -51,7 +86,44 @@ class ListingsScraper(BaseScraper):
             
             listings.append({
                 "detail_url": full_url,
-                "category": category
+                "category": category,
+                **self.extract_summary(box, title_link),
             })
         
         return listings
+
+    def extract_summary(self, box, title_link) -> Dict[str, Any]:
+        # Whatever the card shows about the auction's state. When none of it
+        # changed, the detail page is assumed unchanged too (delta mode).
+        summary = {"title": title_link.get_text(strip=True) or None}
+
+        price = box.find(class_=re.compile("price"))
+        if not price:
+            price = box.find(string=re.compile(r"\d.*\b(lei|LEI|RON)\b"))
+        summary['price'] = (price.get_text(strip=True) if hasattr(price, 'get_text') else str(price).strip()) if price else None
+
+        countdown = box.find('div', class_='countdown')
+        if countdown:
+            summary['expire_date'] = countdown.get('data-expire-date')
+            summary['countdown_state'] = " ".join(sorted(countdown.get('class', [])))
+        else:
+            summary['expire_date'] = None
+            summary['countdown_state'] = None
+
+        summary['summary_hash'] = hashlib.sha256(
+            json.dumps(summary, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        return summary
+
+
+# Parser pool entry point, see detail_scraper.parse_detail_page
+_worker_scraper: Optional[ListingsScraper] = None
+
+
+def parse_listings_page(html: str) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Return the listing cards and the page count of a listing page."""
+    global _worker_scraper
+    if _worker_scraper is None:
+        _worker_scraper = ListingsScraper()
+    soup = _worker_scraper.parse_html(html, parse_only=ListingsScraper.PARSE_ONLY)
+    return _worker_scraper.extract_listings(soup), _worker_scraper.parse_total_pages(soup)
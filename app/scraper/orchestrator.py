@@ -1,121 +1,834 @@
 import logging
 import asyncio
 import os
-from sqlalchemy.orm import Session
+from datetime import datetime
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, Optional
+from app.config import settings
+from sqlalchemy import func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only
 from app.database import SessionLocal
-from app.models.listing import Listing
+from app.models.asset import Asset
+from app.models.listing import Listing, ListingChange
+from app.models.scrape_run import ScrapeRun, CrawlJob
 from app.scraper.listings_scraper import ListingsScraper
-from app.scraper.detail_scraper import DetailScraper
+from app.scraper.detail_scraper import DetailScraper, content_hash, parse_detail_page
+from app.scraper.parser_pool import get_parser_pool, parse_workers, run_parser
+from app.scraper.archive import PageArchive
+from app.scraper.asset_mirror import AssetMirror
+from app.scraper.circuit_breaker import CircuitOpenError
 from app.schemas.listing import ListingCreate
+from app.tasks.priority import schedule_failed_refresh, schedule_next_refresh
+from app.utils.cache import invalidate_responses
+from app.utils.history import diff_listing
+from app.tasks.job_queue import claim_jobs, finish_jobs, has_pending_jobs, register_worker, release_dead_leases, take_over_run, unregister_worker
 
 logger = logging.getLogger(__name__)
 
+# Queue sentinels
+_DONE = object()
+_FLUSH = object()
+
+
+# INSERT ... ON CONFLICT flavours, by dialect; others use the ORM path
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_LISTING_COLUMNS = frozenset(Listing.__table__.columns.keys())
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
 class ScraperOrchestrator:
     def __init__(self):
-        self.listings_scraper = ListingsScraper()
-        self.detail_scraper = DetailScraper()
+        self.archive = PageArchive(settings.SCRAPER_ARCHIVE_DIR) if settings.SCRAPER_ARCHIVE_ENABLED else None
+        self.listings_scraper = ListingsScraper(archive=self.archive)
+        self.detail_scraper = DetailScraper(archive=self.archive)
         # Check if we should only scrape active unsold listings
         self.active_unsold_only = os.getenv('SCRAPE_ACTIVE_UNSOLD_ONLY', 'false').lower() == 'true'
+        # Stop discovering as soon as a listing page holds only URLs we already have
+        self.early_stop = settings.SCRAPER_EARLY_STOP
+        # Only fetch detail pages for new listings or ones whose card changed
+        self.delta_mode = settings.SCRAPER_DELTA_MODE
+        # Checkpoint of the crawl in progress, None outside run()/work()
+        self.scrape_run: Optional[ScrapeRun] = None
+        # run() owns the run's row (status, stats); work() only helps with its jobs
+        self.owns_run = False
+        # Lease owner id while run()/work() is active
+        self.worker_id: Optional[str] = None
+        # Set by discovery to wake the job feeder
+        self.jobs_added = asyncio.Event()
+        # Detail pages a resumed run fetched before the restart, by URL
+        self.resume_captures: Dict[str, dict] = {}
 
-    async def run(self):
-        logger.info("Starting scraping job")
-        if self.active_unsold_only:
-            logger.info("Mode: Active unsold listings only")
+    async def run(self, run_id: Optional[int] = None):
+        """Crawl the whole site, checkpointing progress as it goes.
+
+        Discovered URLs and the listing page cursor are saved in crawl_jobs and
+        scrape_runs, and each URL is marked done once its listing is written.
+        Pass the id of an interrupted run to resume it: listing pages before the
+        cursor and detail pages already written are not fetched again.
+        """
+        stats = {"new": 0, "updated": 0, "unchanged": 0, "skipped": 0, "errors": 0}
         db = SessionLocal()
+        self.owns_run = True
+        self.worker_id = register_worker()
         try:
-            # 1. Get all detail URLs from listings pages
-            # No longer using "last scraped" checking - we scrape all pages
-            all_listings_meta = []
-            page = 1
-            
-            while True:
-                listings_batch = await self.listings_scraper.scrape_page(page)
-                if not listings_batch:
-                    break
-                
-                for meta in listings_batch:
-                    all_listings_meta.append(meta)
-                    
-                page += 1
-                if page > 50: # Safety break
-                    break
-            
-            logger.info(f"Found {len(all_listings_meta)} listings to process")
-
-            # 2. Process each listing
-            new_count = 0
-            updated_count = 0
-            skipped_count = 0
-            error_count = 0
-            
-            for meta in all_listings_meta:
-                url = meta['detail_url']
-                category = meta.get('category')
-                
-                try:
-                    # Scrape details
-                    detail_data = await self.detail_scraper.scrape_detail(url)
-                    if not detail_data:
-                        logger.warning(f"No data scraped for {url}")
-                        error_count += 1
+            if run_id is None:
+                # started_at in local time, like the archive's fetched_at
+                self.scrape_run = ScrapeRun(status="running", started_at=datetime.now(), stats=stats, owner=self.worker_id)
+                db.add(self.scrape_run)
+                db.commit()
+                logger.info(f"Starting scraping job (run {self.scrape_run.id})")
+            else:
+                self.scrape_run = db.get(ScrapeRun, run_id)
+                if self.scrape_run is None or self.scrape_run.status == "completed":
+                    logger.warning(f"Run {run_id} does not exist or has already completed")
+                    return
+                if not take_over_run(db, self.scrape_run, self.worker_id):
+                    logger.warning(f"Run {run_id} is still in progress in another call or process; not resuming it")
+                    return
+                stats.update(self.scrape_run.stats or {})
+                logger.info(f"Resuming scraping job (run {run_id}) after listing page {self.scrape_run.last_page}")
+                released = release_dead_leases(db, run_id)
+                if released:
+                    logger.info(f"Released {released} jobs leased by workers that are gone")
+            if self.active_unsold_only:
+                logger.info("Mode: Active unsold listings only")
+
+            # A run killed or cancelled with the process stays "running" and is
+            # resumed on the next startup; see app/tasks/scheduler.py
+            try:
+                await self._run_pipeline(db, stats, self._produce_listings)
+                status = "completed"
+            except CircuitOpenError as e:
+                # The site is down; the remaining requests would all fail too
+                logger.error(f"Aborting scrape: {e}")
+                status = "aborted"
+            except Exception:
+                self._finish_run(db, "aborted", stats)
+                raise
+            self._finish_run(db, status, stats)
+            logger.info(f"Scraping finished. New: {stats['new']}, Updated: {stats['updated']}, Unchanged: {stats['unchanged']}, Skipped: {stats['skipped']}, Errors: {stats['errors']}")
+            if status == "completed" and settings.SCRAPER_MIRROR_ASSETS:
+                await self.mirror_assets(since=self.scrape_run.started_at)
+
+        finally:
+            unregister_worker(self.worker_id)
+            db.close()
+            await self.listings_scraper.close()
+            await self.detail_scraper.close()
+
+    async def work(self, run_id: int):
+        """Help with a run started by another process: claim, fetch and write its jobs.
+
+        Returns once the run has no pending jobs left that another process
+        could still be working on. The run's status and stats stay with the
+        process that called run(); see app/tasks/worker.py.
+        """
+        stats = {"new": 0, "updated": 0, "unchanged": 0, "skipped": 0, "errors": 0}
+        db = SessionLocal()
+        self.worker_id = register_worker()
+        try:
+            self.scrape_run = db.get(ScrapeRun, run_id)
+            if self.scrape_run is None:
+                return
+            logger.info(f"Worker {self.worker_id} joining run {run_id}")
+            try:
+                await self._run_pipeline(db, stats, self._feed_jobs)
+            except CircuitOpenError as e:
+                logger.error(f"Worker leaving run {run_id}: {e}")
+            logger.info(f"Worker done with run {run_id}. New: {stats['new']}, Updated: {stats['updated']}, Unchanged: {stats['unchanged']}, Skipped: {stats['skipped']}, Errors: {stats['errors']}")
+        finally:
+            unregister_worker(self.worker_id)
+            db.close()
+            await self.listings_scraper.close()
+            await self.detail_scraper.close()
+
+    async def mirror_assets(self, since: Optional[datetime] = None):
+        """Copy the images and documents of listings changed since `since` (all if None).
+
+        Each listing's mirrored_assets maps its remote URLs to the local
+        /assets/<sha256> copies. URLs mirrored before are not requested again;
+        downloads run SCRAPER_ASSET_CONCURRENCY at a time within the site's
+        rate budget.
+        """
+        mirror = AssetMirror(settings.SCRAPER_ASSET_DIR)
+        db = SessionLocal()
+        try:
+            query = db.query(Listing).options(
+                load_only(Listing.id, Listing.images, Listing.documents, Listing.mirrored_assets)
+            )
+            if since is not None:
+                query = query.filter(Listing.last_changed_at >= since)
+            listings = query.all()
+            stored = dict(db.query(Asset.url, Asset.sha256))
+            wanted = {url for listing in listings for url in self._asset_urls(listing)}
+            missing = iter(sorted(wanted - stored.keys()))
+            stats = {"downloaded": 0, "stored": len(wanted & stored.keys()), "errors": 0}
+
+            async def download_missing():
+                # The downloaders share one iterator, so each URL goes to one of them
+                for url in missing:
+                    try:
+                        asset = await mirror.download(url)
+                    except CircuitOpenError:
+                        raise
+                    except Exception as e:
+                        logger.error(f"Error mirroring {url}: {e}")
+                        asset = None
+                    if asset is None:
+                        stats['errors'] += 1
                         continue
-                    
-                    # Merge category if found in listing page but not in detail
-                    if category and not detail_data.get('category'):
-                        detail_data['category'] = category
-                    
-                    # Apply filter if active_unsold_only is enabled
-                    if self.active_unsold_only:
-                        is_active = detail_data.get('is_active', True)
-                        is_sold = detail_data.get('is_sold', False)
-                        if not is_active or is_sold:
-                            logger.debug(f"Skipping {url} (active={is_active}, sold={is_sold})")
-                            skipped_count += 1
-                            continue
-                    
-                    # Check if exists
-                    existing = db.query(Listing).filter(Listing.detail_url == url).first()
-                    
-                    if existing:
-                        # Update existing listing with new data
-                        logger.debug(f"Updating existing listing: {url}")
-                        
-                        # Update all fields that might have changed
-                        for key, value in detail_data.items():
-                            if key != 'detail_url' and hasattr(existing, key):
-                                setattr(existing, key, value)
-                        
-                        # Clear any previous errors
-                        existing.scrape_errors = None
-                        
-                        db.commit()
-                        updated_count += 1
-                    else:
-                        # Create new listing
-                        logger.debug(f"Creating new listing: {url}")
-                        listing = Listing(**detail_data)
-                        db.add(listing)
+                    try:
+                        db.add(Asset(**asset))
                         db.commit()
-                        new_count += 1
-                        
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Error processing listing {url}: {e}", exc_info=True)
-                    
-                    # Try to save error to database if listing exists
+                    except IntegrityError:
+                        # Mirrored meanwhile by a concurrent run; same file either way
+                        db.rollback()
+                    stored[url] = asset['sha256']
+                    stats['downloaded'] += 1
+
+            downloaders = [
+                asyncio.create_task(download_missing())
+                for _ in range(max(1, settings.SCRAPER_ASSET_CONCURRENCY))
+            ]
+            try:
+                await asyncio.gather(*downloaders)
+            except CircuitOpenError as e:
+                logger.error(f"Stopping asset mirroring: {e}")
+            finally:
+                for task in downloaders:
+                    task.cancel()
+                await asyncio.gather(*downloaders, return_exceptions=True)
+
+            for listing in listings:
+                mirrored = {url: f"/assets/{stored[url]}" for url in self._asset_urls(listing) if url in stored}
+                if mirrored != (listing.mirrored_assets or {}):
+                    listing.mirrored_assets = mirrored
+            db.commit()
+            invalidate_responses()
+            logger.info(f"Asset mirroring finished. Listings: {len(listings)}, Downloaded: {stats['downloaded']}, Already stored: {stats['stored']}, Errors: {stats['errors']}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _asset_urls(listing: Listing) -> list:
+        return [url for url in (listing.images or []) + (listing.documents or []) if isinstance(url, str)]
+
+    def _finish_run(self, db: Session, status: str, stats: dict):
+        db.rollback()
+        self.scrape_run.status = status
+        self.scrape_run.stats = dict(stats)
+        self.scrape_run.finished_at = datetime.now()
+        self.scrape_run.owner = None
+        db.commit()
+
+    async def refresh(self, budget: int):
+        """Re-check the listings that are due, most urgent first.
+
+        At most `budget` detail pages are fetched. Listings with the shortest
+        refresh interval (auctions about to close) are served first; see
+        app/tasks/priority.py for how intervals are assigned.
+        """
+        stats = {"new": 0, "updated": 0, "unchanged": 0, "skipped": 0, "errors": 0}
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            due = db.query(Listing.detail_url, Listing.category).filter(
+                or_(Listing.next_refresh_at.is_(None), Listing.next_refresh_at <= now)
+            ).order_by(
+                func.coalesce(Listing.refresh_interval, 0), Listing.next_refresh_at
+            ).limit(budget).all()
+            if not due:
+                return
+            logger.info(f"Refreshing {len(due)} due listings")
+
+            async def produce_due(_db: Session, url_queue: asyncio.Queue) -> int:
+                for url, category in due:
+                    await url_queue.put({"detail_url": url, "category": category})
+                return len(due)
+
+            try:
+                await self._run_pipeline(db, stats, produce_due)
+            except CircuitOpenError as e:
+                logger.error(f"Aborting refresh: {e}")
+                return
+            logger.info(f"Refresh finished. Updated: {stats['updated']}, Unchanged: {stats['unchanged']}, Skipped: {stats['skipped']}, Errors: {stats['errors']}")
+            if settings.SCRAPER_MIRROR_ASSETS:
+                await self.mirror_assets(since=now)
+        finally:
+            db.close()
+
+    async def _run_pipeline(self, db: Session, stats: dict, produce: Callable[[Session, asyncio.Queue], Awaitable[int]]):
+        """URL producer -> detail fetchers -> parsers -> batched DB writer.
+
+        The stages run concurrently and hand work over bounded queues: a full
+        queue blocks the stage feeding it, so memory stays flat however large
+        the site is and the slowest stage sets the pace. Every DB call is
+        synchronous with no await inside it, so the stages can share `db`.
+        """
+        queue_size = max(1, settings.SCRAPER_QUEUE_SIZE)
+        # Kept short: URLs waiting here are leased jobs whose lease is running
+        url_queue = asyncio.Queue(maxsize=max(1, settings.SCRAPER_CONCURRENCY))
+        parse_queue = asyncio.Queue(maxsize=queue_size)
+        write_queue = asyncio.Queue(maxsize=queue_size)
+
+        producer = asyncio.create_task(produce(db, url_queue))
+        fetchers = [
+            asyncio.create_task(self._fetch_stage(db, url_queue, parse_queue, write_queue, stats))
+            for _ in range(max(1, settings.SCRAPER_CONCURRENCY))
+        ]
+        parsers = [
+            asyncio.create_task(self._parse_stage(parse_queue, write_queue, stats))
+            for _ in range(max(1, parse_workers()))
+        ]
+        writer = asyncio.create_task(self._write_stage(db, write_queue, stats))
+        tasks = [producer, *fetchers, *parsers, writer]
+
+        # A crashed stage would leave its neighbours blocked on a queue forever
+        def cancel_all_on_error(task):
+            if not task.cancelled() and task.exception():
+                for other in tasks:
+                    other.cancel()
+
+        for task in tasks:
+            task.add_done_callback(cancel_all_on_error)
+
+        try:
+            found = await producer
+            logger.info(f"Found {found} listings to process")
+            # Shut the stages down in order, each after its input is drained
+            for _ in fetchers:
+                await url_queue.put(_DONE)
+            await asyncio.gather(*fetchers)
+            for _ in parsers:
+                await parse_queue.put(_DONE)
+            await asyncio.gather(*parsers)
+            await write_queue.put(_DONE)
+            await writer
+        except asyncio.CancelledError:
+            failed = [task for task in tasks if task.done() and not task.cancelled() and task.exception()]
+            if failed:
+                raise failed[0].exception()
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+            # No stage may touch `db` after the caller closes it
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _produce_listings(self, db: Session, url_queue: asyncio.Queue) -> int:
+        """Discover listings into crawl_jobs while feeding claimed jobs to the fetchers.
+
+        Returns how many listings were discovered. Worker processes running
+        work() claim jobs from the same table, so the run is shared with them.
+        """
+        discovery = asyncio.create_task(self._discover_listings(db))
+        feeder = asyncio.create_task(self._feed_jobs(db, url_queue))
+        try:
+            found, _claimed = await asyncio.gather(discovery, feeder)
+            return found
+        finally:
+            for task in (discovery, feeder):
+                task.cancel()
+            await asyncio.gather(discovery, feeder, return_exceptions=True)
+
+    async def _discover_listings(self, db: Session) -> int:
+        # Every page's new URLs are saved to crawl_jobs together with the page
+        # cursor. On resume the walk continues after the cursor.
+        run = self.scrape_run
+        seen = set()
+        pending = set()
+        for url, status in db.query(CrawlJob.detail_url, CrawlJob.status).filter(CrawlJob.run_id == run.id):
+            seen.add(url)
+            if status == "pending":
+                pending.add(url)
+        if pending:
+            logger.info(f"{len(pending)} listings discovered before the restart are still pending")
+            if self.archive:
+                # Pages fetched before the restart but never written are read
+                # back from the archive instead of being fetched again
+                started_at = run.started_at.isoformat()
+                for entry in self.archive.entries("detail"):
+                    if entry["url"] in pending and entry["fetched_at"] >= started_at:
+                        self.resume_captures[entry["url"]] = entry
+                logger.info(f"{len(self.resume_captures)} of them are in the archive already")
+
+        # URLs that were new when this run found them. The writer may have
+        # stored them by the time they show up again on a later page, which
+        # must not count as "known" for early stop.
+        discovered = set()
+        # While the priority refresh runs, it keeps stored listings up to date
+        # on their own schedule (closed ones once a day at most, or rarer). The
+        # crawl fetches new listings, due ones, and ones whose card changed.
+        leave_to_refresh = settings.REFRESH_INTERVAL_MINUTES > 0
+        started = datetime.now()
+        delta_skipped = 0
+        not_due = 0
+
+        async def absorb(listings_batch, page: int) -> bool:
+            # New listings push older ones towards later pages while we crawl,
+            # so the same URL can show up on two pages; keep the first copy.
+            # Returns True when every URL on the page was already in the DB.
+            nonlocal delta_skipped, not_due
+            # Stored listings on this page: card hash and when the priority
+            # refresh checks them next. Looked up per page, so a run never
+            # holds the whole table.
+            urls = [meta['detail_url'] for meta in listings_batch]
+            known = {
+                url: (summary_hash, next_refresh_at)
+                for url, summary_hash, next_refresh_at in db.query(
+                    Listing.detail_url, Listing.summary_hash, Listing.next_refresh_at
+                ).filter(Listing.detail_url.in_(urls))
+            }
+            for meta in listings_batch:
+                url = meta['detail_url']
+                if url in seen:
+                    continue
+                seen.add(url)
+                skip = False
+                if url not in known:
+                    discovered.add(url)
+                else:
+                    summary_hash, next_refresh_at = known[url]
+                    card_unchanged = summary_hash == meta.get('summary_hash')
+                    if leave_to_refresh and next_refresh_at is not None and next_refresh_at > started and card_unchanged:
+                        skip = True
+                        not_due += 1
+                    elif self.delta_mode and card_unchanged:
+                        # Card unchanged since the last scrape: skip the detail fetch
+                        skip = True
+                        delta_skipped += 1
+                db.add(CrawlJob(
+                    run_id=run.id,
+                    detail_url=url,
+                    category=meta.get('category'),
+                    summary_hash=meta.get('summary_hash'),
+                    status="skipped" if skip else "pending",
+                ))
+            run.last_page = page
+            db.commit()
+            self.jobs_added.set()
+            return all(url in known and url not in discovered for url in urls)
+
+        if not run.discovery_done:
+            try:
+                await self._walk_listing_pages(run, absorb)
+            finally:
+                if not_due:
+                    logger.info(f"{not_due} known listings not due for a check yet, left to the priority refresh")
+                if self.delta_mode:
+                    logger.info(f"Delta mode: {delta_skipped} listings unchanged on listing pages, not fetched")
+            run.discovery_done = True
+            db.commit()
+            self.jobs_added.set()
+        return len(seen)
+
+    async def _feed_jobs(self, db: Session, url_queue: asyncio.Queue) -> int:
+        """Claim the run's pending jobs a few at a time and queue them; returns how many.
+
+        Stops once discovery is over and every pending job is either leased
+        to this process (already queued) or gone. Jobs other processes hold
+        are waited for: if their lease runs out, they are claimed here.
+        """
+        run = self.scrape_run
+        claimed = 0
+        while True:
+            jobs = claim_jobs(db, run.id, self.worker_id, max(1, settings.SCRAPER_CONCURRENCY))
+            for meta in jobs:
+                await url_queue.put(meta)
+            claimed += len(jobs)
+            if jobs:
+                continue
+
+            db.refresh(run)
+            if run.discovery_done and not has_pending_jobs(db, run.id, exclude_owner=self.worker_id):
+                return claimed
+            # Wait for discovery to add jobs, or for other workers' leases.
+            # asyncio.wait, not wait_for, so a cancel is never swallowed.
+            self.jobs_added.clear()
+            waiter = asyncio.ensure_future(self.jobs_added.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=settings.SCRAPER_JOB_POLL_SECONDS)
+            finally:
+                waiter.cancel()
+
+    async def _walk_listing_pages(self, run: ScrapeRun, absorb: Callable[[list, int], Awaitable[bool]]):
+        # Page 1 yields the page count from the pagination control; the rest
+        # are fetched in waves of SCRAPER_CONCURRENCY, within the shared rate
+        # budget, starting after the run's cursor
+        if run.last_page == 0:
+            first_page = await self.listings_scraper.scrape_page(1)
+            if not first_page:
+                return
+            # Read from the page just fetched; None without a pagination control
+            run.total_pages = self.listings_scraper.total_pages
+            if await absorb(first_page, 1) and self.early_stop:
+                logger.info("Early stop: page 1 holds only known listings")
+                return
+
+        if run.total_pages is None:
+            logger.warning("No pagination control found; walking pages until an empty one")
+            last_page = settings.SCRAPER_MAX_PAGES
+        else:
+            logger.info(f"Pagination reports {run.total_pages} pages")
+            last_page = min(run.total_pages, settings.SCRAPER_MAX_PAGES)
+
+        wave_size = max(1, settings.SCRAPER_CONCURRENCY)
+        page = run.last_page + 1
+        while page <= last_page:
+            wave = list(range(page, min(page + wave_size, last_page + 1)))
+            batches = await asyncio.gather(*(self.listings_scraper.scrape_page(p) for p in wave))
+            # Walk the wave in page order so early stop and the cursor see pages in sequence
+            for wave_page, listings_batch in zip(wave, batches):
+                if not listings_batch:
+                    return
+                if await absorb(listings_batch, wave_page) and self.early_stop:
+                    logger.info(f"Early stop: page {wave_page} holds only known listings")
+                    return
+            page += wave_size
+
+    async def _fetch_stage(self, db: Session, url_queue: asyncio.Queue, parse_queue: asyncio.Queue, write_queue: asyncio.Queue, stats: dict):
+        while (meta := await url_queue.get()) is not _DONE:
+            url = meta['detail_url']
+            try:
+                # Validators from the previous scrape, for the conditional GET
+                known = db.query(
+                    Listing.etag, Listing.last_modified, Listing.content_hash
+                ).filter(Listing.detail_url == url).first()
+
+                capture = self.resume_captures.pop(url, None)
+                if capture is not None:
+                    page = self.detail_scraper.archived_detail(capture, previous_hash=known.content_hash if known else None)
+                else:
+                    page = await self.detail_scraper.fetch_detail(
+                        url,
+                        etag=known.etag if known else None,
+                        last_modified=known.last_modified if known else None,
+                        previous_hash=known.content_hash if known else None,
+                    )
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                stats['errors'] += 1
+                logger.error(f"Error fetching listing {url}: {e}", exc_info=True)
+                self._fail_job(db, url, str(e))
+                continue
+
+            if page and meta.get('summary_hash'):
+                # Stored only once the listing is written, so a failed fetch
+                # is retried by the next delta run
+                page['summary_hash'] = meta['summary_hash']
+
+            if not page:
+                logger.warning(f"No data scraped for {url}")
+                stats['errors'] += 1
+                self._fail_job(db, url, "Detail page could not be fetched")
+            elif page.get('unchanged'):
+                # Same content as last run: nothing to parse; the writer only
+                # pushes back the listing's next refresh
+                logger.debug(f"Unchanged listing: {url}")
+                await write_queue.put((meta, page, None))
+            else:
+                await parse_queue.put((meta, page))
+
+    def _fail_job(self, db: Session, url: str, error: str):
+        # Retries already happened in fetch_response; don't hand it out again
+        if self.scrape_run is not None:
+            finish_jobs(db, self.scrape_run.id, [url], "error")
+        # A stored listing's next check moves back too, or one that keeps
+        # failing (removed from the site) would be due on every refresh tick.
+        # Like _mark_unchanged, only when the check was due.
+        listing = db.query(Listing).filter(Listing.detail_url == url).first()
+        if listing is not None:
+            listing.scrape_errors = error[:500]
+            now = datetime.now()
+            if listing.next_refresh_at is None or listing.next_refresh_at <= now:
+                schedule_failed_refresh(listing, now)
+        db.commit()
+
+    async def _parse_stage(self, parse_queue: asyncio.Queue, write_queue: asyncio.Queue, stats: dict):
+        while (item := await parse_queue.get()) is not _DONE:
+            meta, page = item
+            try:
+                detail_data = await run_parser(parse_detail_page, meta['detail_url'], page.pop('html'))
+                detail_data.update(page)
+                await write_queue.put((meta, detail_data, None))
+            except Exception as e:
+                # Recorded on the listing by the writer
+                await write_queue.put((meta, None, e))
+
+    async def _write_stage(self, db: Session, write_queue: asyncio.Queue, stats: dict):
+        # Flush when the batch is full, or after a quiet spell so a slow crawl
+        # still lands in the DB progressively. asyncio.wait rather than
+        # wait_for: on 3.10/3.11 wait_for can swallow a cancellation that
+        # races with an incoming item, and the writer would outlive the run.
+        batch = []
+        getter = None
+        try:
+            while True:
+                if getter is None:
+                    getter = asyncio.ensure_future(write_queue.get())
+                done, _pending = await asyncio.wait({getter}, timeout=settings.SCRAPER_WRITE_FLUSH_SECONDS)
+                if done:
+                    item = getter.result()
+                    getter = None
+                else:
+                    item = _FLUSH
+                if item is not _DONE and item is not _FLUSH:
+                    batch.append(item)
+                if batch and (item is _DONE or item is _FLUSH or len(batch) >= settings.SCRAPER_WRITE_BATCH_SIZE):
+                    self._write_batch(db, batch, stats)
+                    batch = []
+                if item is _DONE:
+                    return
+        finally:
+            if getter is not None:
+                getter.cancel()
+
+    def _write_batch(self, db: Session, batch: list, stats: dict):
+        # One transaction per batch. If it fails, redo the rows one by one so a
+        # bad listing only loses itself.
+        batch_stats = dict.fromkeys(stats, 0)
+        try:
+            upsert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+            if upsert is not None:
+                self._upsert_batch(db, upsert, batch, batch_stats)
+            else:
+                for meta, detail_data, error in batch:
+                    if error is None:
+                        self._apply_listing(db, detail_data, meta.get('category'), batch_stats)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Batch write failed ({e}); retrying {len(batch)} listings one by one")
+            batch_stats = dict.fromkeys(stats, 0)
+            for i, (meta, detail_data, error) in enumerate(batch):
+                if error is None:
                     try:
-                        existing = db.query(Listing).filter(Listing.detail_url == url).first()
-                        if existing:
-                            existing.scrape_errors = str(e)[:500]  # Limit error message length
-                            db.commit()
-                    except Exception as save_error:
-                        logger.error(f"Could not save error to database: {save_error}")
-                    
-                    db.rollback()
-            
-            logger.info(f"Scraping finished. New: {new_count}, Updated: {updated_count}, Skipped: {skipped_count}, Errors: {error_count}")
+                        self._save_listing(db, detail_data, meta.get('category'), batch_stats)
+                    except Exception as row_error:
+                        db.rollback()
+                        batch[i] = (meta, detail_data, row_error)
+
+        for meta, _detail_data, error in batch:
+            if error is not None:
+                batch_stats['errors'] += 1
+                logger.error(f"Error processing listing {meta['detail_url']}: {error}", exc_info=error)
+                self._save_error(db, meta['detail_url'], error)
+
+        for key, value in batch_stats.items():
+            stats[key] += value
+
+        # Unchanged listings only had their refresh bookkeeping touched,
+        # which no API response shows
+        if batch_stats['new'] or batch_stats['updated'] or batch_stats['errors']:
+            invalidate_responses()
+
+        if self.scrape_run is not None:
+            self._checkpoint(db, batch, stats)
 
+    def _checkpoint(self, db: Session, batch: list, stats: dict):
+        # Written URLs are not fetched again if the run is resumed; failed
+        # ones are not retried either, like in an uninterrupted run
+        run_id = self.scrape_run.id
+        finish_jobs(db, run_id, [meta['detail_url'] for meta, _detail_data, error in batch if error is None], "done")
+        finish_jobs(db, run_id, [meta['detail_url'] for meta, _detail_data, error in batch if error is not None], "error")
+        if self.owns_run:
+            self.scrape_run.stats = dict(stats)
+        db.commit()
+
+    def _upsert_batch(self, db: Session, upsert, batch: list, stats: dict):
+        """Write a batch with one SELECT for the listings already stored.
+
+        New listings go in with INSERT ... ON CONFLICT (detail_url) DO UPDATE,
+        one statement per set of fields, so a field the parser did not find
+        keeps its stored value like in the ORM path (and a listing another
+        worker inserted meanwhile is updated rather than failing the batch).
+        Stored listings get only their changed fields written.
+        """
+        now = datetime.now()
+        items = [(meta, detail_data) for meta, detail_data, error in batch if error is None]
+        existing = {
+            listing.detail_url: listing
+            for listing in db.query(Listing).filter(Listing.detail_url.in_([data['detail_url'] for _meta, data in items]))
+        }
+        rows_by_url = {}
+        for meta, detail_data in items:
+            url = detail_data['detail_url']
+            listing = existing.get(url)
+            if detail_data.get('unchanged'):
+                if listing is not None:
+                    self._mark_unchanged(listing, detail_data, now)
+                stats['unchanged'] += 1
+                continue
+            if not self._prepare_listing(detail_data, meta.get('category'), stats):
+                continue
+            if listing is not None:
+                self._update_listing(db, listing, detail_data, stats, now)
+                continue
+
+            row = {key: value for key, value in detail_data.items() if key in _LISTING_COLUMNS}
+            row['scrape_errors'] = None
+            # The schedule only depends on the new data
+            listing = Listing(**row)
+            schedule_next_refresh(listing, changed=True, now=now)
+            for key in ('refresh_interval', 'next_refresh_at', 'last_checked_at', 'last_changed_at'):
+                row[key] = getattr(listing, key)
+            stats['new'] += 1
+            rows_by_url[url] = row
+
+        groups = {}
+        for row in rows_by_url.values():
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        for columns, rows in groups.items():
+            statement = upsert(Listing.__table__)
+            statement = statement.on_conflict_do_update(
+                index_elements=[Listing.detail_url],
+                set_={
+                    **{column: statement.excluded[column] for column in columns if column != 'detail_url'},
+                    'updated_at': func.now(),
+                },
+            )
+            db.execute(statement, rows)
+
+    def _save_listing(self, db: Session, detail_data: dict, category: Optional[str], stats: dict):
+        self._apply_listing(db, detail_data, category, stats)
+        db.commit()
+
+    def _apply_listing(self, db: Session, detail_data: dict, category: Optional[str], stats: dict):
+        url = detail_data['detail_url']
+
+        if detail_data.get('unchanged'):
+            existing = db.query(Listing).filter(Listing.detail_url == url).first()
+            if existing:
+                self._mark_unchanged(existing, detail_data, datetime.now())
+            stats['unchanged'] += 1
+            return
+
+        if not self._prepare_listing(detail_data, category, stats):
+            return
+
+        existing = db.query(Listing).filter(Listing.detail_url == url).first()
+
+        if existing:
+            self._update_listing(db, existing, detail_data, stats, datetime.now())
+        else:
+            # Create new listing
+            logger.debug(f"Creating new listing: {url}")
+            listing = Listing(**detail_data)
+            schedule_next_refresh(listing, changed=True)
+            db.add(listing)
+            stats['new'] += 1
+
+    def _update_listing(self, db: Session, existing: Listing, detail_data: dict, stats: dict, now: datetime):
+        # Only fields whose value differs are written (the ORM leaves equal
+        # values out of the UPDATE), and only those go into the history
+        changes = diff_listing(existing, detail_data)
+        for key in ('content_hash', 'summary_hash', 'etag', 'last_modified'):
+            if key in detail_data:
+                setattr(existing, key, detail_data[key])
+        existing.scrape_errors = None
+        if not changes:
+            # Refetched, but only the page around the listing differed
+            self._mark_unchanged(existing, detail_data, now)
+            stats['unchanged'] += 1
+            return
+
+        logger.debug(f"Updating existing listing: {existing.detail_url} ({', '.join(changes)})")
+        for field in changes:
+            setattr(existing, field, detail_data[field])
+        existing.updated_at = func.now()
+        schedule_next_refresh(existing, changed=True, now=now)
+        db.add(ListingChange(
+            listing_id=existing.id,
+            run_id=self.scrape_run.id if self.scrape_run is not None else None,
+            changed_at=now,
+            changes=changes,
+        ))
+        stats['updated'] += 1
+
+    def _mark_unchanged(self, existing: Listing, detail_data: dict, now: datetime):
+        # Same data as last time. The next check only moves back if this one
+        # was due; a crawl passing by early leaves the schedule alone. Fresh
+        # validators are kept either way.
+        if detail_data.get('summary_hash'):
+            existing.summary_hash = detail_data['summary_hash']
+        for key in ('etag', 'last_modified'):
+            if key in detail_data:
+                setattr(existing, key, detail_data[key])
+        if existing.next_refresh_at is None or existing.next_refresh_at <= now:
+            schedule_next_refresh(existing, changed=False, now=now)
+
+    def _prepare_listing(self, detail_data: dict, category: Optional[str], stats: dict) -> bool:
+        # Merge category if found in listing page but not in detail
+        if category and not detail_data.get('category'):
+            detail_data['category'] = category
+
+        # Apply filter if active_unsold_only is enabled
+        if self.active_unsold_only:
+            is_active = detail_data.get('is_active', True)
+            is_sold = detail_data.get('is_sold', False)
+            if not is_active or is_sold:
+                logger.debug(f"Skipping {detail_data['detail_url']} (active={is_active}, sold={is_sold})")
+                stats['skipped'] += 1
+                return False
+        return True
+
+    def _save_error(self, db: Session, url: str, error: Exception):
+        # Try to save error to database if listing exists
+        try:
+            db.rollback()
+            existing = db.query(Listing).filter(Listing.detail_url == url).first()
+            if existing:
+                existing.scrape_errors = str(error)[:500]  # Limit error message length
+                db.commit()
+        except Exception as save_error:
+            logger.error(f"Could not save error to database: {save_error}")
+            db.rollback()
+
+    def replay(self):
+        """Re-run extraction over the raw HTML archive, without touching the network.
+
+        Uses the latest archived capture of every listing and detail page, so a
+        parser fix can be backfilled in seconds instead of a full crawl.
+        """
+        if not self.archive:
+            logger.error("Replay requested but SCRAPER_ARCHIVE_ENABLED is off")
+            return
+
+        logger.info(f"Replaying archived pages from {self.archive.root}")
+        categories = {}
+        for _entry, html in self.archive.iter_latest("listing"):
+            for meta in self.listings_scraper.parse_listings(html):
+                categories[meta['detail_url']] = meta.get('category')
+
+        stats = {"new": 0, "updated": 0, "unchanged": 0, "skipped": 0, "errors": 0}
+        db = SessionLocal()
+        pool = get_parser_pool()
+        try:
+            for batch in _chunks(self.archive.iter_latest("detail"), 256):
+                # Parse the whole batch across the pool, then save in order
+                if pool:
+                    jobs = [pool.submit(parse_detail_page, entry['url'], html) for entry, html in batch]
+                for i, (entry, html) in enumerate(batch):
+                    url = entry['url']
+                    try:
+                        detail_data = jobs[i].result() if pool else parse_detail_page(url, html)
+                        detail_data['content_hash'] = content_hash(html)
+                        self._save_listing(db, detail_data, categories.get(url), stats)
+                    except Exception as e:
+                        stats['errors'] += 1
+                        logger.error(f"Error replaying listing {url}: {e}", exc_info=True)
+                        self._save_error(db, url, e)
+                invalidate_responses()
         finally:
             db.close()
-            await self.listings_scraper.close()
-            await self.detail_scraper.close()
+
+        logger.info(f"Replay finished. New: {stats['new']}, Updated: {stats['updated']}, Unchanged: {stats['unchanged']}, Skipped: {stats['skipped']}, Errors: {stats['errors']}")
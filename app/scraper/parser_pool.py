@@ -0,0 +1,50 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def parse_workers() -> int:
+    if settings.SCRAPER_PARSE_WORKERS is None:
+        return os.cpu_count() or 1
+    return settings.SCRAPER_PARSE_WORKERS
+
+
+def get_parser_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the process-wide parser pool, or None when parsing runs inline."""
+    global _pool
+    workers = parse_workers()
+    if workers <= 0:
+        return None
+    if _pool is None:
+        # spawn, not fork: the API process runs threads (uvicorn, scheduler)
+        # that must not be duplicated into the workers
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"Started HTML parser pool with {workers} workers")
+    return _pool
+
+
+async def run_parser(func: Callable[..., Any], *args) -> Any:
+    """Run a module-level parse function in the pool without blocking the event loop.
+
+    `func` and its arguments are pickled, so only plain data (HTML strings in,
+    dicts out) crosses the process boundary.
+    """
+    pool = get_parser_pool()
+    if pool is None:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+
+def shutdown_parser_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
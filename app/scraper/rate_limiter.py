@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket shared by every request to one host.
+
+    Tokens refill continuously at `rate` per second up to `burst`; each request
+    takes one token. A rate of 0 disables limiting.
+
+    The rate adapts to the host's health: throttling signals (429/503,
+    timeouts, latency well above the usual) halve it down to `min_rate`, and
+    healthy responses raise it again in small steps up to the configured rate.
+    """
+
+    # Latency this many times the baseline counts as the host struggling
+    LATENCY_FACTOR = 2.0
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = 0.1):
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._last_slowdown = 0.0
+        self._latency: Optional[float] = None  # EWMA of response times
+        self._baseline: Optional[float] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def slow_down(self):
+        if self.max_rate <= 0:
+            return
+        # Requests in flight fail together; count them as one signal
+        now = time.monotonic()
+        if now - self._last_slowdown < 1.0 / max(self.rate, self.min_rate):
+            return
+        self._last_slowdown = now
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        logger.warning(f"Host is struggling, request rate lowered to {self.rate:.2f}/s")
+
+    def record_success(self, latency: float):
+        if self.max_rate <= 0:
+            return
+        self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+        # The baseline follows the fastest recent latency but can creep up,
+        # so a host that is permanently slower is not throttled forever
+        self._baseline = self._latency if self._baseline is None else min(self._latency, self._baseline * 1.01)
+        if self._latency > self.LATENCY_FACTOR * self._baseline:
+            self.slow_down()
+        elif self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+def default_rate() -> float:
+    if settings.SCRAPER_REQUESTS_PER_SECOND is not None:
+        rate = settings.SCRAPER_REQUESTS_PER_SECOND
+    elif settings.SCRAPER_REQUEST_DELAY > 0:
+        # Backwards compatible with the old fixed delay between requests
+        rate = 1.0 / settings.SCRAPER_REQUEST_DELAY
+    else:
+        return 0
+    # The rate is the budget for the whole site; worker processes split it
+    return rate / max(1, settings.SCRAPER_WORKERS)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+
+
+def get_limiter(url: str) -> TokenBucket:
+    """Return the process-wide limiter for the host of `url`."""
+    host = urlsplit(url).netloc
+    limiter = _limiters.get(host)
+    if limiter is None:
+        limiter = TokenBucket(default_rate(), settings.SCRAPER_BURST, settings.SCRAPER_MIN_REQUESTS_PER_SECOND)
+        _limiters[host] = limiter
+    return limiter
@@ -6,6 +6,12 @@ function listingsApp() {
         view: 'grid', // 'grid', 'list', or 'detail'
         selectedListing: null,
         subscriptionEmail: '',
+        // Cursors from the last response, for the Next/Previous buttons.
+        // Relevance-ranked searches come with page numbers instead.
+        nextCursor: null,
+        prevCursor: null,
+        nextPageNumber: null,
+        prevPageNumber: null,
 
         filters: {
             search: '',
@@ -32,7 +38,7 @@ function listingsApp() {
             });
         },
 
-        async fetchListings() {
+        async fetchListings(cursor = null, page = 1) {
             this.loading = true;
             try {
                 // Build query string
@@ -54,13 +60,22 @@ function listingsApp() {
                     params.append('auction_status', 'Licitatie in desfasurare');
                 }
 
-                params.append('page', this.filters.page);
+                // Without a cursor (new filters) this is the first page
+                if (cursor) params.append('cursor', cursor);
+                else if (page > 1) params.append('page', page);
+                // Only what the cards show; the full listing is loaded on open
+                params.append('view', 'summary');
                 params.append('page_size', this.filters.page_size);
 
                 const response = await fetch(`/listings/?${params.toString()}`);
                 if (!response.ok) throw new Error('Failed to fetch listings');
 
                 this.listings = await response.json();
+                this.filters.page = page;
+                this.nextCursor = response.headers.get('X-Next-Cursor');
+                this.prevCursor = response.headers.get('X-Prev-Cursor');
+                this.nextPageNumber = response.headers.get('X-Next-Page');
+                this.prevPageNumber = response.headers.get('X-Prev-Page');
 
                 // Scroll to top
                 document.querySelector('.main-content').scrollTop = 0;
@@ -155,19 +170,31 @@ function listingsApp() {
         },
 
         nextPage() {
-            this.filters.page++;
-            this.fetchListings();
+            if (this.nextCursor) {
+                this.fetchListings(this.nextCursor, this.filters.page + 1);
+            } else if (this.nextPageNumber) {
+                this.fetchListings(null, Number(this.nextPageNumber));
+            }
         },
 
         prevPage() {
-            if (this.filters.page > 1) {
-                this.filters.page--;
-                this.fetchListings();
+            if (this.prevCursor) {
+                this.fetchListings(this.prevCursor, this.filters.page - 1);
+            } else if (this.prevPageNumber) {
+                this.fetchListings(null, Number(this.prevPageNumber));
             }
         },
 
-        openDetail(listing) {
-            this.selectedListing = listing;
+        async openDetail(listing) {
+            try {
+                const response = await fetch(`/listings/${listing.id}`);
+                if (!response.ok) throw new Error('Failed to fetch listing');
+                this.selectedListing = await response.json();
+            } catch (error) {
+                console.error('Error fetching listing:', error);
+                alert('Error loading listing. Please try again.');
+                return;
+            }
             this.view = 'detail';
             window.history.pushState({ view: 'detail', id: listing.id }, '', `#listing-${listing.id}`);
             document.querySelector('.main-content').scrollTop = 0;
@@ -179,6 +206,11 @@ function listingsApp() {
             window.history.pushState({}, '', '/');
         },
 
+        // The mirrored copy of an image or document when there is one
+        assetUrl(url) {
+            return this.selectedListing?.mirrored_assets?.[url] || url;
+        },
+
         formatCurrency(value) {
             if (value === null || value === undefined || value === '') return 'N/A';
             // If value is already a string, return it as-is
@@ -0,0 +1,194 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.scrape_run import CrawlJob, ScrapeRun
+
+logger = logging.getLogger(__name__)
+
+# crawl_jobs doubles as the work queue of a run: pending rows are claimed by
+# whichever process (the one running the crawl, or `python -m app.tasks.worker`)
+# asks first, under a lease. A lease that runs out before the job is finished,
+# because its worker died or hung, makes the job claimable again.
+
+
+# Lease owners of the run()/work() calls active in this process
+_live_owners: Set[str] = set()
+
+
+def register_worker() -> str:
+    """Return a new lease owner id, host:pid:token, and mark it live.
+
+    The token tells apart two owners in the same process (a run resumed
+    after being cancelled) or two processes that got the same pid, e.g. the
+    app restarted as pid 1 in a container.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    _live_owners.add(owner)
+    return owner
+
+
+def unregister_worker(owner: str):
+    _live_owners.discard(owner)
+
+
+def claim_jobs(db: Session, run_id: int, owner: str, limit: int) -> List[dict]:
+    """Lease up to `limit` pending jobs of a run to `owner` and return them.
+
+    One UPDATE statement picks and leases the rows, so two workers never get
+    the same job. PostgreSQL skips rows another transaction is claiming
+    (FOR UPDATE SKIP LOCKED) instead of waiting on them; SQLite takes a write
+    lock on the whole database for the statement, which serialises claims.
+    """
+    now = datetime.now()
+
+    # Jobs whose leases keep running out are probably killing their worker
+    exhausted = db.execute(
+        update(CrawlJob)
+        .where(
+            CrawlJob.run_id == run_id,
+            CrawlJob.status == "pending",
+            CrawlJob.lease_expires_at < now,
+            CrawlJob.attempts >= settings.SCRAPER_JOB_MAX_ATTEMPTS,
+        )
+        .values(status="error", lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if exhausted:
+        logger.warning(f"Gave up on {exhausted} jobs of run {run_id} after {settings.SCRAPER_JOB_MAX_ATTEMPTS} expired leases")
+
+    claimable = select(CrawlJob.id).where(
+        CrawlJob.run_id == run_id,
+        CrawlJob.status == "pending",
+        or_(CrawlJob.lease_expires_at.is_(None), CrawlJob.lease_expires_at < now),
+    ).order_by(CrawlJob.id).limit(limit)
+    if db.get_bind().dialect.name == "postgresql":
+        claimable = claimable.with_for_update(skip_locked=True)
+
+    rows = db.execute(
+        update(CrawlJob)
+        .where(CrawlJob.id.in_(claimable))
+        .values(
+            lease_owner=owner,
+            lease_expires_at=now + timedelta(seconds=settings.SCRAPER_LEASE_SECONDS),
+            attempts=CrawlJob.attempts + 1,
+        )
+        .returning(CrawlJob.detail_url, CrawlJob.category, CrawlJob.summary_hash)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return [
+        {"detail_url": url, "category": category, "summary_hash": summary_hash}
+        for url, category, summary_hash in rows
+    ]
+
+
+def finish_jobs(db: Session, run_id: int, urls: List[str], status: str):
+    """Mark jobs done/error. Idempotent: only still-pending jobs change.
+
+    When a lease expired and two workers ended up processing the same job,
+    the first to finish wins and the second call is a no-op. Not committed;
+    the caller commits it with the listing writes.
+    """
+    if not urls:
+        return
+    db.execute(
+        update(CrawlJob)
+        .where(CrawlJob.run_id == run_id, CrawlJob.detail_url.in_(urls), CrawlJob.status == "pending")
+        .values(status=status, lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def has_pending_jobs(db: Session, run_id: int, exclude_owner: Optional[str] = None) -> bool:
+    """Whether the run still has pending jobs, apart from live leases of `exclude_owner`."""
+    query = db.query(CrawlJob.id).filter(CrawlJob.run_id == run_id, CrawlJob.status == "pending")
+    if exclude_owner is not None:
+        query = query.filter(or_(
+            CrawlJob.lease_owner.is_(None),
+            CrawlJob.lease_owner != exclude_owner,
+            CrawlJob.lease_expires_at < datetime.now(),
+        ))
+    return db.query(query.exists()).scalar()
+
+
+def release_dead_leases(db: Session, run_id: int) -> int:
+    """Free the leases of workers on this host that no longer exist.
+
+    Lets a run resumed after a restart pick its jobs up at once instead of
+    waiting for the dead worker's leases to run out. Leases held on other
+    hosts can't be checked and are left to expire.
+    """
+    host = socket.gethostname()
+    owners = [
+        owner for (owner,) in db.query(CrawlJob.lease_owner).filter(
+            CrawlJob.run_id == run_id, CrawlJob.status == "pending", CrawlJob.lease_owner.like(f"{host}:%")
+        ).distinct()
+    ]
+    dead = [owner for owner in owners if not _owner_alive(owner)]
+    if not dead:
+        return 0
+    released = db.execute(
+        update(CrawlJob)
+        .where(CrawlJob.run_id == run_id, CrawlJob.status == "pending", CrawlJob.lease_owner.in_(dead))
+        .values(lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return released
+
+
+def run_in_progress(db: Session, run: ScrapeRun) -> bool:
+    """Whether a live process is still working on the run.
+
+    That is its owner (the run() call that started or resumed it) or a
+    worker holding an unexpired lease on one of its jobs. Owners on other
+    hosts can't be checked and count as live.
+    """
+    if run.owner is not None and _maybe_alive(run.owner):
+        return True
+    lease_owners = db.query(CrawlJob.lease_owner).filter(
+        CrawlJob.run_id == run.id, CrawlJob.status == "pending", CrawlJob.lease_expires_at > datetime.now()
+    ).distinct()
+    return any(_maybe_alive(owner) for (owner,) in lease_owners)
+
+
+def take_over_run(db: Session, run: ScrapeRun, owner: str) -> bool:
+    """Make `owner` the owner of an interrupted run; False if it isn't interrupted.
+
+    The owner changes only if it is still the one just checked, so of two
+    processes resuming the same run at once, one gets it.
+    """
+    if run_in_progress(db, run):
+        return False
+    taken = db.execute(
+        update(ScrapeRun)
+        .where(ScrapeRun.id == run.id, ScrapeRun.owner.is_not_distinct_from(run.owner))
+        .values(owner=owner, status="running")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    db.refresh(run)
+    return bool(taken)
+
+
+def _maybe_alive(owner: str) -> bool:
+    return not owner.startswith(f"{socket.gethostname()}:") or _owner_alive(owner)
+
+
+def _owner_alive(owner: str) -> bool:
+    pid = int(owner.split(":")[1])
+    if pid == os.getpid():
+        return owner in _live_owners
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    return True
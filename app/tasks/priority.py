@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from app.config import settings
+from app.models.listing import Listing
+
+# How often a listing is polled, by how close its next deadline is. Listings
+# that are about to close change (bids, current offer) the most.
+HOT = timedelta(minutes=5)        # Deadline within the hour
+WARM = timedelta(minutes=15)      # Deadline today
+ACTIVE = timedelta(hours=2)       # Deadline this week
+IDLE = timedelta(hours=12)        # Deadline further out, or unknown
+JUST_CLOSED = timedelta(minutes=30)  # Ended in the last day: catch the final result
+COLD = timedelta(days=1)          # Sold or long closed
+FAILED = timedelta(minutes=30)    # Least wait after a fetch that failed
+
+
+def next_deadline(listing: Listing, now: datetime) -> Optional[datetime]:
+    upcoming = [
+        deadline for deadline in (listing.registration_deadline, listing.auction_end_date)
+        if deadline is not None and deadline > now
+    ]
+    return min(upcoming, default=None)
+
+
+def base_interval(listing: Listing, now: datetime) -> timedelta:
+    """Polling interval for a listing that has just changed."""
+    if listing.is_sold or listing.status == 'ADJUDECAT':
+        return COLD
+
+    deadline = next_deadline(listing, now)
+    if deadline is None:
+        ended = listing.auction_end_date
+        if ended is not None and now - ended < timedelta(days=1):
+            return JUST_CLOSED
+        return IDLE if listing.is_active else COLD
+
+    remaining = deadline - now
+    if remaining <= timedelta(hours=1):
+        return HOT
+    if remaining <= timedelta(days=1):
+        return WARM
+    if remaining <= timedelta(days=7):
+        return ACTIVE
+    return IDLE
+
+
+def schedule_next_refresh(listing: Listing, changed: bool, now: Optional[datetime] = None):
+    """Set refresh_interval/next_refresh_at after a listing was checked.
+
+    A listing that changed is polled again at its base interval. Each check
+    that finds it unchanged doubles the interval (up to
+    REFRESH_MAX_INTERVAL_HOURS), so quiet listings fade out of the budget.
+    The next check never lands after the listing's next deadline.
+    """
+    now = now or datetime.now()
+    base = base_interval(listing, now)
+    if changed or not listing.refresh_interval:
+        interval = base
+    else:
+        interval = timedelta(seconds=listing.refresh_interval * 2)
+    interval = max(base, min(interval, timedelta(hours=settings.REFRESH_MAX_INTERVAL_HOURS)))
+
+    next_refresh = now + interval
+    deadline = next_deadline(listing, now)
+    if deadline is not None and deadline < next_refresh:
+        next_refresh = deadline
+
+    listing.refresh_interval = int(interval.total_seconds())
+    listing.next_refresh_at = next_refresh
+    listing.last_checked_at = now
+    if changed:
+        listing.last_changed_at = now
+
+
+def schedule_failed_refresh(listing: Listing, now: Optional[datetime] = None):
+    """Set the next check after a fetch that failed (a 404, retries used up).
+
+    Backs off like an unchanged check, but never retries sooner than FAILED,
+    deadlines included: a listing the site removed would otherwise stay due
+    and take refresh budget on every tick.
+    """
+    now = now or datetime.now()
+    schedule_next_refresh(listing, changed=False, now=now)
+    listing.next_refresh_at = max(listing.next_refresh_at, now + FAILED)
@@ -1,7 +1,11 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from app.config import settings
+from app.database import SessionLocal
+from app.models.scrape_run import ScrapeRun
 from app.scraper.orchestrator import ScraperOrchestrator
+from app.tasks.job_queue import run_in_progress
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,8 +17,49 @@ async def run_daily_scrape():
     orchestrator = ScraperOrchestrator()
     await orchestrator.run()
 
+async def resume_scrape(run_id: int):
+    orchestrator = ScraperOrchestrator()
+    await orchestrator.run(run_id)
+
+def resume_interrupted_runs():
+    # A run still marked "running" at startup, with nobody left working on
+    # it, was cut off by a restart. Continue the latest run; older ones are
+    # superseded by it. A run another app process is still on is left alone.
+    db = SessionLocal()
+    try:
+        running = db.query(ScrapeRun).filter(ScrapeRun.status == "running").order_by(ScrapeRun.id.desc()).all()
+        interrupted = [run for run in running if not run_in_progress(db, run)]
+        if not interrupted:
+            return
+        latest = running[0]
+        for stale in interrupted:
+            if stale is not latest:
+                stale.status = "aborted"
+        db.commit()
+        if latest not in interrupted:
+            return
+        run_id = latest.id
+    finally:
+        db.close()
+    logger.info(f"Resuming interrupted scrape run {run_id}")
+    scheduler.add_job(resume_scrape, args=[run_id])
+
+async def run_priority_refresh():
+    # Re-checks known listings by urgency; the daily crawl still discovers new ones
+    orchestrator = ScraperOrchestrator()
+    await orchestrator.refresh(settings.REFRESH_BUDGET)
+
 def start_scheduler():
     trigger = CronTrigger(hour=settings.DAILY_SCRAPE_HOUR)
     scheduler.add_job(run_daily_scrape, trigger)
+    if settings.REFRESH_INTERVAL_MINUTES > 0:
+        scheduler.add_job(
+            run_priority_refresh,
+            IntervalTrigger(minutes=settings.REFRESH_INTERVAL_MINUTES),
+            max_instances=1,
+            coalesce=True,
+        )
+    if settings.SCRAPER_RESUME_ON_STARTUP:
+        resume_interrupted_runs()
     scheduler.start()
-    logger.info(f"Scheduler started. Daily scrape at {settings.DAILY_SCRAPE_HOUR}:00")
+    logger.info(f"Scheduler started. Daily scrape at {settings.DAILY_SCRAPE_HOUR}:00, refresh every {settings.REFRESH_INTERVAL_MINUTES} min (budget {settings.REFRESH_BUDGET} requests)")
@@ -0,0 +1,56 @@
+"""Standalone crawl worker.
+
+    python -m app.tasks.worker [--once]
+
+Joins whichever scrape run is in progress and works through its detail pages
+alongside the app, claiming them from the crawl_jobs table. Start as many as
+the site's rate budget allows, on this host or others sharing the database,
+and set SCRAPER_WORKERS to the total number of crawling processes.
+"""
+import argparse
+import asyncio
+import logging
+from app.config import settings
+from app.database import SessionLocal, engine, Base
+from app.models.scrape_run import ScrapeRun
+from app.scraper.orchestrator import ScraperOrchestrator
+from app.scraper.parser_pool import shutdown_parser_pool
+from app.scraper.http_client import close_http_client
+from app.utils.logger import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def current_run_id():
+    db = SessionLocal()
+    try:
+        return db.query(ScrapeRun.id).filter(ScrapeRun.status == "running").order_by(ScrapeRun.id.desc()).limit(1).scalar()
+    finally:
+        db.close()
+
+
+async def main(once: bool):
+    Base.metadata.create_all(bind=engine)
+    try:
+        while True:
+            run_id = current_run_id()
+            if run_id is None:
+                await asyncio.sleep(settings.SCRAPER_JOB_POLL_SECONDS)
+                continue
+            await ScraperOrchestrator().work(run_id)
+            if once:
+                return
+            # The run is drained but stays "running" until its owner wraps it up
+            while current_run_id() == run_id:
+                await asyncio.sleep(settings.SCRAPER_JOB_POLL_SECONDS)
+    finally:
+        shutdown_parser_pool()
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Work on the scrape run in progress")
+    parser.add_argument("--once", action="store_true", help="exit after helping with one run")
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(main(args.once))
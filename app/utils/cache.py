@@ -0,0 +1,232 @@
+import gzip
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import Request, Response
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Cache for the read API's JSON responses. Listing data only changes when the
+# scraper writes, so a response stays valid until then: the scraper bumps a
+# generation number after each batch it commits, and entries are stored under
+# the generation they were built in. Older generations are never read again
+# and age out of the LRU (or expire, in Redis).
+#
+# The generation lives with the cache. In memory it is per process, so writes
+# by separate crawl workers (app.tasks.worker) only show once entries expire;
+# with RESPONSE_CACHE_REDIS_URL every process shares it.
+
+
+# Content codings offered, best first. Bodies are compressed once per cache
+# entry, not per request, so the levels lean towards smaller output.
+_ENCODERS: Dict[str, Callable[[bytes], bytes]] = {}
+if brotli is not None:
+    _ENCODERS["br"] = lambda body: brotli.compress(body, quality=5)
+_ENCODERS["gzip"] = lambda body: gzip.compress(body, compresslevel=6)
+
+# Smaller bodies gain less than the header overhead
+_MIN_COMPRESS_SIZE = 1000
+
+
+class CachedResponse:
+    __slots__ = ("body", "headers", "etag", "encoded")
+
+    def __init__(self, body: bytes, headers: Dict[str, str], etag: Optional[str] = None, encoded: Optional[Dict[str, bytes]] = None):
+        self.body = body
+        self.headers = headers
+        # Strong validator from the bytes themselves: a scrape that didn't
+        # change this response keeps its ETag, and clients keep getting 304s
+        self.etag = etag or f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.encoded = encoded or {}  # Compressed bodies, by content coding
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        # Each coding is its own representation with its own strong ETag
+        return f'{self.etag[:-1]}-{encoding}"' if encoding else self.etag
+
+
+class MemoryCache:
+    """LRU of up to `max_entries` responses, each kept for at most `ttl` seconds."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._generation = 0
+
+    async def generation(self) -> int:
+        return self._generation
+
+    def bump(self):
+        self._generation += 1
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires, entry = item
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CachedResponse):
+        self._entries[key] = (time.monotonic() + self.ttl, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class RedisCache:
+    """Responses and the generation in Redis, shared by the API and crawl workers.
+
+    Entries expire after `ttl`; size is bounded by the server's maxmemory
+    policy (allkeys-lru).
+    """
+
+    GENERATION_KEY = "responses:generation"
+
+    def __init__(self, url: str, ttl: float):
+        import redis
+        import redis.asyncio
+
+        self.ttl = ttl
+        self._client = redis.asyncio.Redis.from_url(url)
+        # The scraper writes from sync code
+        self._sync_client = redis.Redis.from_url(url)
+
+    async def generation(self) -> int:
+        return int(await self._client.get(self.GENERATION_KEY) or 0)
+
+    def bump(self):
+        self._sync_client.incr(self.GENERATION_KEY)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        item = await self._client.hgetall(f"responses:{key}")
+        if not item:
+            return None
+        encoded = {encoding: item[encoding.encode()] for encoding in _ENCODERS if encoding.encode() in item}
+        return CachedResponse(item[b"body"], json.loads(item[b"headers"]), item[b"etag"].decode(), encoded)
+
+    async def set(self, key: str, entry: CachedResponse):
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(f"responses:{key}", mapping={"body": entry.body, "headers": json.dumps(entry.headers), "etag": entry.etag, **entry.encoded})
+            pipe.expire(f"responses:{key}", max(1, int(self.ttl)))
+            await pipe.execute()
+
+    async def close(self):
+        await self._client.aclose()
+        self._sync_client.close()
+
+
+def _create_cache():
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    if settings.RESPONSE_CACHE_REDIS_URL:
+        try:
+            return RedisCache(settings.RESPONSE_CACHE_REDIS_URL, settings.RESPONSE_CACHE_TTL_SECONDS)
+        except ImportError:
+            logger.warning("RESPONSE_CACHE_REDIS_URL is set but the 'redis' package is not installed, caching in memory")
+    return MemoryCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+response_cache = _create_cache()
+
+
+def invalidate_responses():
+    """Called after the scraper commits listing changes."""
+    if response_cache is None:
+        return
+    try:
+        response_cache.bump()
+    except Exception as e:
+        # Cached responses stay until they expire; the write itself succeeded
+        logger.warning(f"Could not invalidate cached responses: {e}")
+
+
+async def close_response_cache():
+    if isinstance(response_cache, RedisCache):
+        await response_cache.close()
+
+
+def _etag_matches(if_none_match: str, entry: CachedResponse) -> bool:
+    # Weak comparison, as If-None-Match asks for (RFC 9110 13.1.2). A client
+    # holding any coding of this body has the current version.
+    if if_none_match.strip() == "*":
+        return True
+    current = {entry.etag_for(encoding) for encoding in (None, *_ENCODERS)}
+    return any(tag.strip().removeprefix("W/") in current for tag in if_none_match.split(","))
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in _ENCODERS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+async def cached_json(request: Request, key: str, render: Callable[[], Awaitable[Tuple[bytes, Dict[str, str]]]]) -> Response:
+    """The JSON response for `key`, from the cache or built by `render`.
+
+    `render` returns the body and any extra headers. Clients that already hold
+    the current version (If-None-Match) get an empty 304.
+    """
+    entry = None
+    if response_cache is not None:
+        try:
+            key = f"{await response_cache.generation()}:{key}"
+            entry = await response_cache.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache unavailable: {e}")
+            key = None
+    if entry is None:
+        body, headers = await render()
+        entry = CachedResponse(body, headers)
+        if response_cache is not None and key is not None:
+            try:
+                await response_cache.set(key, entry)
+            except Exception as e:
+                logger.warning(f"Response cache unavailable: {e}")
+
+    encoding = None
+    if len(entry.body) >= _MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding and encoding not in entry.encoded:
+        entry.encoded[encoding] = _ENCODERS[encoding](entry.body)
+        # The in-memory cache holds this very object; Redis needs it stored again
+        if isinstance(response_cache, RedisCache) and key is not None:
+            try:
+                await response_cache.set(key, entry)
+            except Exception as e:
+                logger.warning(f"Response cache unavailable: {e}")
+
+    # Browsers may keep the response but check back every time, which costs a
+    # 304 when nothing changed
+    headers = {**entry.headers, "ETag": entry.etag_for(encoding), "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, entry):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return Response(content=entry.encoded[encoding], media_type="application/json", headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
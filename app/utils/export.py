@@ -0,0 +1,201 @@
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Sequence
+import orjson
+from sqlalchemy import JSON
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Writers for the bulk export: each turns one batch of rows into the next
+# bytes of the file, so the whole export never sits in memory at once.
+# `write` gets a batch, `close` the file's tail; either may return b"" when
+# there is nothing to send yet.
+
+
+class NDJSONWriter:
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def __init__(self, columns: dict):
+        self.names = list(columns)
+
+    def write(self, rows: Sequence) -> bytes:
+        option = orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE
+        return b"".join(orjson.dumps(dict(zip(self.names, row)), option=option) for row in rows)
+
+    def close(self) -> bytes:
+        return b""
+
+
+def _python_type(sql_type):
+    try:
+        return sql_type.python_type
+    except NotImplementedError:
+        return str  # Computed columns without a declared type
+
+
+def _csv_json(value):
+    # Image and document lists, mirrored asset maps
+    return None if value is None else orjson.dumps(value).decode()
+
+
+def _csv_bool(value):
+    return None if value is None else ("true" if value else "false")
+
+
+def _csv_datetime(value):
+    return None if value is None else value.isoformat()
+
+
+class CSVWriter:
+    media_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def __init__(self, columns: dict):
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer)
+        self._csv.writerow(columns)
+        # Only these columns need converting; the csv module writes the
+        # others as they are, None as an empty field
+        self._conversions = []
+        for index, column in enumerate(columns.values()):
+            if isinstance(column.type, JSON):
+                self._conversions.append((index, _csv_json))
+            elif _python_type(column.type) is bool:
+                self._conversions.append((index, _csv_bool))
+            elif _python_type(column.type) is datetime:
+                self._conversions.append((index, _csv_datetime))
+
+    def write(self, rows: Sequence) -> bytes:
+        if self._conversions:
+            rows = [list(row) for row in rows]
+            for row in rows:
+                for index, convert in self._conversions:
+                    row[index] = convert(row[index])
+        self._csv.writerows(rows)
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def close(self) -> bytes:
+        # An export with no rows is still a file with a header line
+        return self.write([])
+
+
+class _Chunks:
+    """Write-only file for pyarrow; `take` hands over what was written since."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_type(python_type, sql_type):
+    if python_type is bool:
+        return pyarrow.bool_()
+    if python_type is int:
+        return pyarrow.int64()
+    if python_type is float:
+        return pyarrow.float64()
+    if python_type is datetime:
+        return pyarrow.timestamp("us", tz="UTC" if getattr(sql_type, "timezone", False) else None)
+    # Strings, and JSON columns as their JSON text
+    return pyarrow.string()
+
+
+class ParquetWriter:
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self, columns: dict):
+        python_types = [_python_type(column.type) for column in columns.values()]
+        self.schema = pyarrow.schema([(name, _arrow_type(python_type, column.type))
+                                      for (name, column), python_type in zip(columns.items(), python_types)])
+        self._json = [isinstance(column.type, JSON) for column in columns.values()]
+        self._file = _Chunks()
+        # Columnar and compressed already, so it is sent without Content-Encoding
+        self._writer = pyarrow.parquet.ParquetWriter(self._file, self.schema, compression="zstd")
+
+    def write(self, rows: Sequence) -> bytes:
+        if not rows:
+            return b""
+        # One row group per batch
+        arrays = []
+        for field, is_json, values in zip(self.schema, self._json, zip(*rows)):
+            if is_json:
+                values = [None if value is None else orjson.dumps(value).decode() for value in values]
+            arrays.append(pyarrow.array(values, type=field.type))
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        return self._file.take()
+
+    def close(self) -> bytes:
+        # The footer, with the schema and row group index
+        self._writer.close()
+        return self._file.take()
+
+
+WRITERS = {"ndjson": NDJSONWriter, "csv": CSVWriter, "parquet": ParquetWriter}
+
+
+class ExportUnavailable(Exception):
+    pass
+
+
+def create_writer(format: str, columns: dict):
+    if format == "parquet" and pyarrow is None:
+        raise ExportUnavailable("Parquet export needs the 'pyarrow' package, which is not installed")
+    return WRITERS[format](columns)
+
+
+class StreamCompressor:
+    """Content coding applied chunk by chunk, for bodies that are never whole."""
+
+    def __init__(self, encoding: str):
+        # Compressed on every request, unlike cached responses, so the
+        # fastest levels: brotli 1 still beats gzip 6 on listing exports
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=1)
+            self._compress, self._finish = self._compressor.process, self._compressor.finish
+        else:
+            # wbits 31: the gzip container
+            self._compressor = zlib.compressobj(1, zlib.DEFLATED, 31)
+            self._compress, self._finish = self._compressor.compress, self._compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
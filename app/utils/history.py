@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable
+from app.models.listing import Listing, ListingChange
+
+# Listing columns whose values make up its history. Hashes, HTTP validators,
+# refresh scheduling and the like are bookkeeping: they move on every check
+# and are not recorded.
+TRACKED_FIELDS = (
+    'title', 'category', 'status', 'auction_status', 'auction_type',
+    'starting_price', 'current_offer', 'guarantee_amount', 'bid_count',
+    'starting_price_value', 'current_offer_value', 'guarantee_amount_value', 'price_value', 'currency',
+    'auction_start_date', 'auction_end_date', 'registration_deadline', 'viewing_deadline',
+    'county', 'city', 'address', 'contact_person', 'contact_phone', 'contact_email',
+    'description', 'observations', 'images', 'documents', 'number_of_images',
+    'is_active', 'is_sold',
+)
+
+_DATETIME_FIELDS = frozenset(
+    field for field in TRACKED_FIELDS if Listing.__table__.c[field].type.python_type is datetime
+)
+
+
+def _to_json(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _from_json(field: str, value: Any) -> Any:
+    if value is not None and field in _DATETIME_FIELDS:
+        return datetime.fromisoformat(value)
+    return value
+
+
+def diff_listing(current: Any, data: dict) -> Dict[str, list]:
+    """Changes `data` makes to a stored listing, as field -> [old, new].
+
+    `current` is a Listing or a row with the tracked columns. Fields missing
+    from `data` are left as they are, so they don't count as changes. Values
+    are JSON-ready (datetimes as ISO strings).
+    """
+    changes = {}
+    for field in TRACKED_FIELDS:
+        if field not in data:
+            continue
+        old, new = _to_json(getattr(current, field)), _to_json(data[field])
+        if old != new:
+            changes[field] = [old, new]
+    return changes
+
+
+def listing_as_of(listing: Listing, later_changes: Iterable[ListingChange]) -> Dict[str, Any]:
+    """Tracked fields of `listing` before `later_changes` (newest first) happened."""
+    state = {field: getattr(listing, field) for field in TRACKED_FIELDS}
+    for change in later_changes:
+        for field, (old, _new) in change.changes.items():
+            if field in state:
+                state[field] = _from_json(field, old)
+    return state
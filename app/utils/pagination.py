@@ -0,0 +1,96 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+from sqlalchemy.sql import Select
+
+# Keyset (cursor) pagination for the listings API. A page is "the next N rows
+# after the last one the client saw", found by index range seeks on the sort
+# key and id, so page 500 costs the same as page 1 and rows written by a
+# scrape in the meantime don't shift later pages.
+#
+# Rows without a sort key (no price yet, no end date) come last in both
+# directions, like the SQL NULLS LAST ordering did. They are a separate range
+# ordered by id, read once the keyed range is exhausted.
+
+# sort parameter -> (column, descending)
+SORTS = {
+    "id": ("id", False),
+    "-id": ("id", True),
+    "created": ("created_at", False),
+    "-created": ("created_at", True),
+    "end": ("auction_end_date", False),
+    "-end": ("auction_end_date", True),
+    "price": ("price_value", False),
+    "-price": ("price_value", True),
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, row: Any, forward: bool) -> str:
+    """Opaque cursor pointing just after (forward) or before `row`."""
+    value = getattr(row, SORTS[sort][0])
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "v": value, "i": row.id, "f": forward}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, listing) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        position = {"sort": payload["s"], "value": payload["v"], "id": int(payload["i"]), "forward": bool(payload["f"])}
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed cursor")
+    if position["sort"] != sort:
+        raise InvalidCursor(f"Cursor is for sort={position['sort']}, not sort={sort}")
+    column = getattr(listing, SORTS[sort][0])
+    if position["value"] is not None and column.type.python_type is datetime:
+        try:
+            position["value"] = datetime.fromisoformat(position["value"])
+        except (ValueError, TypeError):
+            raise InvalidCursor("Malformed cursor")
+    return position
+
+
+def keyset_queries(query: Select, listing, sort: str, position: Optional[dict] = None) -> List[Select]:
+    """The queries that read a page, in order; run them until the page is full.
+
+    Without `position` this is the first page. A backward position (a
+    "previous" cursor) gives its rows in reverse order; the caller flips them.
+    """
+    name, descending = SORTS[sort]
+    key = getattr(listing, name)
+    forward = position is None or position["forward"]
+    # Reading backwards walks the same order the other way round
+    reverse = descending == forward
+
+    def ordered(q, *columns):
+        return q.order_by(*(column.desc() if reverse else column.asc() for column in columns))
+
+    def beyond(column, value):
+        # Strictly after the position in reading direction
+        return column < value if reverse else column > value
+
+    if name == "id":
+        if position is not None:
+            query = query.where(beyond(listing.id, position["id"]))
+        return [ordered(query, listing.id)]
+
+    # Rows sharing the position's key are read as their own range, so each
+    # query is a plain index seek however many rows tie on the key
+    keyed = ordered(query.where(key.isnot(None)), key, listing.id)
+    unkeyed = ordered(query.where(key.is_(None)), listing.id)
+    if position is None:
+        return [keyed, unkeyed]
+    if position["value"] is None:
+        # Inside the keyless tail: forward stays in it, backward moves on to
+        # the keyed rows
+        unkeyed = unkeyed.where(beyond(listing.id, position["id"]))
+        return [unkeyed] if forward else [unkeyed, keyed]
+    tied = ordered(query.where(key == position["value"], beyond(listing.id, position["id"])), listing.id)
+    keyed = keyed.where(beyond(key, position["value"]))
+    return [tied, keyed, unkeyed] if forward else [tied, keyed]
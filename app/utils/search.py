@@ -0,0 +1,128 @@
+import re
+from typing import List
+from sqlalchemy import Table, column, event, func, literal_column, or_, table, text
+from sqlalchemy.sql import Select
+
+# Full-text search over listings, maintained by the database itself so every
+# write path (ORM, upserts, migrations, manual SQL) keeps it in sync:
+#
+# SQLite: an FTS5 table over the listings columns, updated by triggers. The
+#   unicode61 tokenizer folds diacritics (ș/ş -> s, ț/ţ -> t, ă/â -> a, î -> i)
+#   and prefix indexes make "term*" lookups cheap.
+# PostgreSQL: a generated tsvector column with a GIN index. The ro_unaccent
+#   configuration is Romanian stemming behind the unaccent dictionary.
+#
+# Other databases fall back to ILIKE.
+
+SEARCH_COLUMNS = ('title', 'description', 'category', 'county', 'city')
+# Relevance weights, in SEARCH_COLUMNS order
+_SQLITE_WEIGHTS = (10.0, 1.0, 4.0, 2.0, 2.0)
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new = ", ".join(f"new.{name}" for name in SEARCH_COLUMNS)
+_old = ", ".join(f"old.{name}" for name in SEARCH_COLUMNS)
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+        {_columns}, content='listings', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"INSERT INTO listings_fts(listings_fts, rank) VALUES ('rank', 'bm25({', '.join(map(str, _SQLITE_WEIGHTS))})')",
+    f"""CREATE TRIGGER IF NOT EXISTS listings_fts_insert AFTER INSERT ON listings BEGIN
+        INSERT INTO listings_fts(rowid, {_columns}) VALUES (new.id, {_new});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS listings_fts_delete AFTER DELETE ON listings BEGIN
+        INSERT INTO listings_fts(listings_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old});
+    END""",
+    # Only when a searched column changes, not on every refresh bookkeeping write
+    f"""CREATE TRIGGER IF NOT EXISTS listings_fts_update AFTER UPDATE OF {_columns} ON listings BEGIN
+        INSERT INTO listings_fts(listings_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old});
+        INSERT INTO listings_fts(rowid, {_columns}) VALUES (new.id, {_new});
+    END""",
+    # Index whatever rows the table already has
+    "INSERT INTO listings_fts(listings_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS listings_fts_update",
+    "DROP TRIGGER IF EXISTS listings_fts_delete",
+    "DROP TRIGGER IF EXISTS listings_fts_insert",
+    "DROP TABLE IF EXISTS listings_fts",
+]
+
+POSTGRESQL_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'ro_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION ro_unaccent (COPY = romanian);
+            ALTER TEXT SEARCH CONFIGURATION ro_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, romanian_stem;
+        END IF;
+    END $$""",
+    """ALTER TABLE listings ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('ro_unaccent', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('ro_unaccent', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('ro_unaccent', coalesce(county, '') || ' ' || coalesce(city, '')), 'C') ||
+        setweight(to_tsvector('ro_unaccent', coalesce(description, '')), 'D')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_listings_search_vector ON listings USING gin (search_vector)",
+]
+
+POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS ix_listings_search_vector",
+    "ALTER TABLE listings DROP COLUMN IF EXISTS search_vector",
+    "DROP TEXT SEARCH CONFIGURATION IF EXISTS ro_unaccent",
+]
+
+_DDL = {"sqlite": (SQLITE_DDL, SQLITE_DROP), "postgresql": (POSTGRESQL_DDL, POSTGRESQL_DROP)}
+
+_TOKEN = re.compile(r"\w+")
+_fts = table("listings_fts", column("rowid"), column("rank"))
+_search_vector = literal_column("listings.search_vector")
+
+
+def create_search_index(connection):
+    for statement in _DDL.get(connection.dialect.name, ([], []))[0]:
+        connection.execute(text(statement))
+
+
+def drop_search_index(connection):
+    for statement in _DDL.get(connection.dialect.name, ([], []))[1]:
+        connection.execute(text(statement))
+
+
+def install_search_index(listings: Table):
+    """Create/drop the search index along with the listings table (create_all/drop_all)."""
+    event.listen(listings, "after_create", lambda target, connection, **kw: create_search_index(connection))
+    event.listen(listings, "before_drop", lambda target, connection, **kw: drop_search_index(connection))
+
+
+def search_terms(search: str) -> List[str]:
+    return _TOKEN.findall(search.lower())
+
+
+def apply_search(query: Select, listing, search: str, dialect: str, rank: bool = True) -> Select:
+    """Restrict `query` to listings matching every term of `search`, as prefixes.
+
+    With `rank`, the best matches come first; leave it off when the caller
+    orders the results some other way.
+    """
+    terms = search_terms(search)
+    if not terms:
+        return query
+
+    if dialect == "sqlite":
+        # Quoted, so FTS5 syntax in user input ("AND", "-", ":") is just text
+        match = " ".join(f'"{term}"*' for term in terms)
+        query = query.join(_fts, _fts.c.rowid == listing.id).where(text("listings_fts MATCH :fts_match").bindparams(fts_match=match))
+        return query.order_by(_fts.c.rank, listing.id) if rank else query
+
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery("ro_unaccent", " & ".join(f"{term}:*" for term in terms))
+        query = query.where(_search_vector.op("@@")(tsquery))
+        return query.order_by(func.ts_rank_cd(_search_vector, tsquery).desc(), listing.id) if rank else query
+
+    for term in terms:
+        pattern = f"%{term}%"
+        query = query.where(or_(*(getattr(listing, name).ilike(pattern) for name in SEARCH_COLUMNS)))
+    return query
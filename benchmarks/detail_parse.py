@@ -0,0 +1,43 @@
+"""Time DetailScraper.parse_detail per page.
+
+    python -m benchmarks.detail_parse [--pages 200]
+
+"extraction" excludes building the tree, which is what the label index
+changes; "total" is the whole parse_detail call. The 150-label page shows
+how extraction grows with the number of label rows on a page.
+"""
+import argparse
+import time
+from app.scraper.detail_scraper import DetailScraper
+from benchmarks.pages import detail_html
+
+
+def time_per_page(scraper: DetailScraper, pages: list, prebuilt: bool) -> float:
+    parse_html = scraper.parse_html
+    if prebuilt:
+        soups = [parse_html(html) for html in pages]
+    started = time.perf_counter()
+    for index, html in enumerate(pages):
+        if prebuilt:
+            # parse_detail builds its tree through parse_html; hand it the
+            # one made above
+            scraper.parse_html = lambda _html, soup=soups[index]: soup
+        scraper.parse_detail(f"https://anabi.just.ro/licitatiionline/ads/{index}", html)
+    scraper.parse_html = parse_html
+    return (time.perf_counter() - started) / len(pages) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    scraper = DetailScraper()
+    corpora = {
+        "fixture page": [detail_html(number, number % 4) for number in range(args.pages)],
+        "150-label page": [detail_html(number, extra_labels=150) for number in range(max(1, args.pages // 4))],
+    }
+    for name, pages in corpora.items():
+        extraction = time_per_page(scraper, pages, prebuilt=True)
+        total = time_per_page(scraper, pages, prebuilt=False)
+        print(f"{name:15s} extraction {extraction:7.2f} ms/page   total {total:7.2f} ms/page")
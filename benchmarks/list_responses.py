@@ -0,0 +1,68 @@
+"""Payload size and latency of a page of listings, per view and content coding.
+
+    python -m benchmarks.list_responses [--database /tmp/listings.db] [--listings 20000]
+
+Without --database, fills a temporary database with benchmarks.listings_db.
+Requests go through the app in-process, with the response cache off unless
+--cached is given; latency includes decompressing the body client-side.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+VIEWS = {
+    "full": "",
+    "view=summary": "&view=summary",
+    "fields=title,price_value,...": "&fields=title,price_value,county,auction_end_date",
+}
+CODINGS = ("identity", "gzip", "br")
+
+
+def main(database: str, page_size: int, repeat: int, cached: bool):
+    # Settings are read at import, so the app is imported only from here
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{database}",
+        "RESPONSE_CACHE_ENABLED": "true" if cached else "false",
+        "REFRESH_INTERVAL_MINUTES": "0",
+        "SCRAPER_RESUME_ON_STARTUP": "false",
+    })
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    logging.disable(logging.CRITICAL)
+    with TestClient(app) as client:
+        for name, query in VIEWS.items():
+            url = f"/listings/?page_size={page_size}&sort=-price{query}"
+            for coding in CODINGS:
+                headers = {"Accept-Encoding": coding}
+                response = client.get(url, headers=headers)
+                if response.status_code != 200:
+                    sys.exit(f"{url}: HTTP {response.status_code}")
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    client.get(url, headers=headers)
+                elapsed = (time.perf_counter() - started) / repeat * 1000
+                size = int(response.headers.get("content-length") or len(response.content))
+                print(f"{name:30s} {coding:8s} {size:>9,d} B {elapsed:7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", help="made by benchmarks.listings_db; a temporary one if not given")
+    parser.add_argument("--listings", type=int, default=20000, help="size of the temporary database")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cached", action="store_true", help="serve repeats from the response cache")
+    args = parser.parse_args()
+
+    if args.database:
+        main(os.path.abspath(args.database), args.page_size, args.repeat, args.cached)
+    else:
+        import subprocess
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, "listings.db")
+            subprocess.run([sys.executable, "-m", "benchmarks.listings_db", database, "--listings", str(args.listings)], check=True)
+            main(database, args.page_size, args.repeat, args.cached)
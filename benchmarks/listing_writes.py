@@ -0,0 +1,89 @@
+"""Rows per second for the scraper's listing writes.
+
+    python -m benchmarks.listing_writes [--rows 3000] [--mode row-commit orm-batch upsert-batch]
+
+Each mode writes the same parsed listings into a fresh SQLite file: first as
+new listings, then again with changed prices, then marked unchanged.
+row-commit is one lookup and commit per listing (_save_listing), orm-batch
+is the writer's ORM path in batches of 50, upsert-batch the dialect's native
+INSERT ... ON CONFLICT in batches of 50.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+MODES = ("row-commit", "orm-batch", "upsert-batch")
+BATCH_SIZE = 50
+
+
+def main(rows: int, mode: str, directory: str):
+    # Settings are read at import, so the app is imported only from here
+    os.environ["DATABASE_URL"] = f"sqlite:///{directory}/{mode}.db"
+    os.environ["SCRAPER_ARCHIVE_ENABLED"] = "false"
+    from app.database import Base, engine, SessionLocal
+    import app.models.listing, app.models.scrape_run, app.models.asset, app.models.subscription
+    import app.scraper.orchestrator as orchestrator
+    from app.scraper.detail_scraper import DetailScraper, content_hash
+    from benchmarks.pages import detail_html
+
+    Base.metadata.create_all(bind=engine)
+    if mode == "orm-batch":
+        orchestrator._UPSERT_INSERTS = {}
+    scraper = DetailScraper()
+    # Parsing is not what is measured: parse 50 distinct pages once and
+    # give every listing a copy of one of them
+    parsed = {}
+    for variant in (0, 1):
+        for number in range(50):
+            html = detail_html(number, variant)
+            parsed[number, variant] = (scraper.parse_detail("", html), content_hash(html))
+
+    def items(variant: int) -> list:
+        batch = []
+        for number in range(rows):
+            url = f"https://anabi.just.ro/licitatiionline/ads/{number}"
+            data, page_hash = parsed[number % 50, variant]
+            data = dict(data, detail_url=url, content_hash=f"{page_hash}{number}", etag=None, last_modified=None)
+            batch.append(({"detail_url": url, "category": "Autovehicule"}, data, None))
+        return batch
+
+    def write(batch: list) -> float:
+        db = SessionLocal()
+        writer = orchestrator.ScraperOrchestrator()
+        stats = dict.fromkeys(("new", "updated", "unchanged", "skipped", "errors"), 0)
+        started = time.perf_counter()
+        if mode == "row-commit":
+            for meta, data, _error in batch:
+                writer._save_listing(db, data, meta["category"], stats)
+        else:
+            for start in range(0, len(batch), BATCH_SIZE):
+                writer._write_batch(db, batch[start:start + BATCH_SIZE], stats)
+        elapsed = time.perf_counter() - started
+        db.close()
+        return len(batch) / elapsed
+
+    unchanged = [(meta, {"detail_url": meta["detail_url"], "unchanged": True}, None) for meta, _data, _error in items(1)]
+    rates = [write(items(0)), write(items(1)), write(unchanged)]
+    print(f"{mode:13s} insert {rates[0]:7.0f}   update {rates[1]:7.0f}   unchanged {rates[2]:7.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=3000)
+    parser.add_argument("--mode", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.single:
+        main(args.rows, args.single, os.environ["BENCHMARK_DIRECTORY"])
+    else:
+        # One process per mode: each needs its own engine and settings
+        import subprocess
+        with tempfile.TemporaryDirectory() as directory:
+            for mode in args.mode:
+                subprocess.run([sys.executable, "-m", "benchmarks.listing_writes", "--rows", str(args.rows), "--single", mode],
+                               env={**os.environ, "BENCHMARK_DIRECTORY": directory}, check=True)
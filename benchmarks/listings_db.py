@@ -0,0 +1,70 @@
+"""Create a SQLite database of synthetic listings for the API benchmarks.
+
+    python -m benchmarks.listings_db /tmp/listings.db [--listings 100000]
+
+Descriptions are random words (2.4 kB on average), with 1-12 images and a
+document per listing, spread over 4 categories and 41 counties. The same
+arguments always give the same rows.
+"""
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+CATEGORIES = ["Autovehicule", "Imobile", "Bijuterii", "Diverse"]
+WORDS = ("apartament casa teren autoturism dacia logan bijuterii aur argint lot mobilier utilaje "
+         "stare buna functionala reparatii acte complete vizionare program licitatie pret oferta "
+         "garantie predare judet oras strada numar camere suprafata an fabricatie kilometri").split()
+
+
+def fill(engine, count: int, seed: int = 1):
+    from app.models.listing import Listing
+
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    with engine.begin() as connection:
+        for first in range(0, count, 5000):
+            rows = []
+            for number in range(first, min(count, first + 5000)):
+                offer = round(rng.uniform(100, 500000), 2)
+                url = f"https://anabi.just.ro/licitatiionline/ads/{number}"
+                rows.append({
+                    "title": " ".join(rng.choices(WORDS, k=6)).capitalize(),
+                    "category": CATEGORIES[number % len(CATEGORIES)],
+                    "status": "NEADJUDECAT",
+                    "auction_status": "Active",
+                    "current_offer": f"{offer:,.2f} lei",
+                    "current_offer_value": offer,
+                    "price_value": offer,
+                    "currency": "RON",
+                    "bid_count": rng.randint(0, 12),
+                    "auction_start_date": start + timedelta(hours=number % 2000),
+                    "auction_end_date": start + timedelta(hours=number % 2000, days=30),
+                    "county": f"County{number % 41}",
+                    "city": f"City{number % 300}",
+                    "description": " ".join(rng.choices(WORDS, k=rng.randint(80, 520))),
+                    "images": [f"https://anabi.just.ro/img/{number}_{index}.jpg" for index in range(rng.randint(1, 12))],
+                    "documents": [f"https://anabi.just.ro/docs/{number}.pdf"],
+                    "detail_url": url,
+                    "is_active": True,
+                    "is_sold": False,
+                })
+            connection.execute(Listing.__table__.insert(), rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--listings", type=int, default=100000)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+    # Settings are read at import, so the app is imported only from here
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.path)}"
+    from app.database import Base, engine
+    import app.models.listing, app.models.scrape_run, app.models.asset, app.models.subscription
+
+    Base.metadata.create_all(bind=engine)
+    fill(engine, args.listings)
+    print(f"{args.listings} listings in {args.path}")
@@ -0,0 +1,76 @@
+"""Concurrent clients against a running API, for throughput and latency.
+
+    python -m benchmarks.listings_db /tmp/listings.db
+    DATABASE_URL=sqlite:////tmp/listings.db SQLITE_PRODUCTION_MODE=true \\
+        REFRESH_INTERVAL_MINUTES=0 SCRAPER_RESUME_ON_STARTUP=false \\
+        uvicorn app.main:app --port 8765 --no-access-log
+    python -m benchmarks.load_test http://127.0.0.1:8765 --clients 10 50 200
+
+Each client loops over a random mix of a category page sorted by price, a
+listing by id and a county page, as fast as the server answers, for
+--seconds per client count. Set RESPONSE_CACHE_ENABLED=false on the server
+to measure the database path rather than the response cache.
+"""
+import argparse
+import asyncio
+import random
+import time
+import httpx
+
+
+# The category page sorted by price is the slow query of the three (tens of
+# ms on 100k listings); the other two are short
+REQUESTS = {
+    "category": lambda rng, listings: f"/listings/?category=Imobile&sort=-price&page_size=20&page={rng.randint(1, 20)}",
+    "by id": lambda rng, listings: f"/listings/{rng.randint(1, listings)}",
+    "county": lambda rng, listings: f"/listings/?county=County{rng.randint(0, 40)}&page_size=20&page={rng.randint(1, 5)}",
+}
+
+
+def percentile(latencies: list, fraction: float) -> float:
+    return latencies[int(fraction * (len(latencies) - 1))] * 1000 if latencies else float("nan")
+
+
+async def run(url: str, clients: int, seconds: float, listings: int):
+    latencies, errors = {kind: [] for kind in REQUESTS}, 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + seconds
+
+        async def loop(seed: int):
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                kind = rng.choice(list(REQUESTS))
+                started = time.perf_counter()
+                try:
+                    response = await client.get(REQUESTS[kind](rng, listings))
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if response.status_code == 200:
+                    latencies[kind].append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(loop(seed) for seed in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    everything = sorted(latency for kind_latencies in latencies.values() for latency in kind_latencies)
+    print(f"{clients:4d} clients {len(everything) / elapsed:7.1f} req/s   p50 {percentile(everything, .5):7.1f} ms   "
+          f"p99 {percentile(everything, .99):8.1f} ms   {errors} errors")
+    for kind, kind_latencies in latencies.items():
+        kind_latencies.sort()
+        print(f"    {kind:10s} p50 {percentile(kind_latencies, .5):7.1f} ms   p99 {percentile(kind_latencies, .99):8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url")
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--listings", type=int, default=100000, help="ids to pick from, as given to benchmarks.listings_db")
+    args = parser.parse_args()
+    for clients in args.clients:
+        asyncio.run(run(args.url, clients, args.seconds, args.listings))
@@ -0,0 +1,35 @@
+import random
+
+# Synthetic ANABI pages for the benchmarks: the markup of the live site
+# (tests/fixtures has real samples), with enough filler to weigh as much
+
+
+def detail_html(number: int, variant: int = 0, extra_labels: int = 0) -> str:
+    # `variant` changes the price, offer and bid count, like a new bid would;
+    # `extra_labels` adds label/value rows, for pages with long spec lists
+    title = ("ADJUDECAT - " if number % 3 == 0 else "") + f"Autoturism Dacia Logan {number}"
+    labels = "".join(f'<p><span class="ad-info-name">Camp {j}</span> <span class="ad-info-value">v{j}</span></p>'
+                     for j in range(extra_labels))
+    specs = "".join(f"<tr><td>{name}</td><td>{value}</td></tr>"
+                    for name, value in (("Marca", "DACIA"), ("Model", "Logan"), ("Culoare", "Alb")))
+    filler = "".join(f"<p class='x'>Paragraf {j} cu text oarecare</p>" for j in range(60))
+    return f"""<html><head><title>t</title><script>var csrf='{random.random()}';</script></head><body>
+<div class="container"><ol class="breadcrumb"><li>Acasa</li><li>Autovehicule</li><li>x</li></ol>
+<h1>{title}</h1>
+<div class="fotorama"><img src="/img/{number}_1.jpg"><img src="/img/{number}_2.jpg"></div>
+<div class="ad-info">{labels}
+<p><span class="ad-info-name">Pret</span> <span class="ad-info-value">{1000 + number + variant:,}.50 lei</span></p>
+<p><span class="ad-info-name">Garanție de participare</span> <span class="ad-info-value">{100 + number}.05 lei</span></p>
+<p><span class="ad-info-name">Tip licitație</span> <span class="ad-info-value">Prima licitatie</span></p>
+<p><span class="ad-info-name">Număr oferte</span> <span class="ad-info-value">{variant}</span></p>
+<p><span class="ad-info-name">Publicata la</span> <span class="ad-info-value">01.11.2025 10:00</span></p>
+<p><span class="ad-info-name">Expira la</span> <span class="ad-info-value">29.12.2025 10:00</span></p>
+<p><span class="ad-info-name"><i class="fa fa-map-marker"></i>  Loc predare: </span> <span class="ad-info-value"> Bragadiru, Ilfov </span></p>
+<p><span class="ad-info-name">Categorie</span> <span class="ad-info-value">Autovehicule</span></p>
+</div>
+<div class="sidebar"><h3><span class="left">Oferta actuala:</span> <span class="right">{1815 + variant:,}.00 lei</span></h3>
+<div class="countdown" data-expire-date="2025-12-11 15:00:00">2 zile 3h 4m 5s</div>
+<div class="sidebar-user-info"><p><i class="fa fa-phone"></i> 0712345678</p><p><i class="fa fa-at"></i> a@b.ro</p><p><i class="fa fa-map-marker"></i> Str X</p></div></div>
+<div class="ads-detail"><p>Descriere lunga a bunului {number}.</p>{filler}<table>{specs}</table></div>
+<a href="/docs/{number}.pdf">Descarca anunt</a>
+</body></html>"""
@@ -0,0 +1,128 @@
+"""API-style reads while the scraper writes, with and without SQLITE_PRODUCTION_MODE.
+
+    python -m benchmarks.sqlite_concurrency [--rows 6000] [--readers 4]
+
+Seeds 2000 listings, then writes --rows more in batches of 50 while reader
+processes loop over a recent-20 page, a get by id and a LIKE scan over the
+descriptions, through the API's read engine. Prints the write rate, read
+rate and latency, and any "database is locked" errors.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+MODES = ("default", "production")
+SEED_ROWS = 2000
+BATCH_SIZE = 50
+
+
+def read_loop(seed: int, done, results):
+    from sqlalchemy import func, select
+    from app.database import AsyncSessionLocal
+    from app.models.listing import Listing
+
+    async def loop():
+        rng = random.Random(seed)
+        latencies, errors = [], []
+        while not done.is_set():
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(select(Listing).where(Listing.category == "Autovehicule").order_by(Listing.id.desc()).limit(20))
+                    await db.get(Listing, rng.randint(1, SEED_ROWS))
+                    await db.scalar(select(func.count()).select_from(Listing).where(Listing.description.ilike("%paragraf 5%")))
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {str(e).splitlines()[0][:60]}")
+        return latencies, errors
+
+    results.put(asyncio.run(loop()))
+
+
+def main(rows: int, readers: int, mode: str, directory: str):
+    # Settings are read at import, so the app is imported only from here
+    os.environ["DATABASE_URL"] = f"sqlite:///{directory}/{mode}.db"
+    os.environ["SQLITE_PRODUCTION_MODE"] = "true" if mode == "production" else "false"
+    os.environ["SCRAPER_ARCHIVE_ENABLED"] = "false"
+    from app.database import Base, engine, SessionLocal
+    import app.models.listing, app.models.scrape_run, app.models.asset, app.models.subscription
+    from app.scraper.orchestrator import ScraperOrchestrator
+    from app.scraper.detail_scraper import DetailScraper
+    from benchmarks.pages import detail_html
+
+    Base.metadata.create_all(bind=engine)
+    scraper = DetailScraper()
+    parsed = [scraper.parse_detail("", detail_html(number)) for number in range(50)]
+
+    def items(start: int, stop: int) -> list:
+        batch = []
+        for number in range(start, stop):
+            url = f"https://anabi.just.ro/licitatiionline/ads/{number}"
+            data = dict(parsed[number % 50], detail_url=url, content_hash=str(number))
+            batch.append(({"detail_url": url, "category": "Autovehicule"}, data, None))
+        return batch
+
+    def write(batch: list) -> dict:
+        db = SessionLocal()
+        stats = dict.fromkeys(("new", "updated", "unchanged", "skipped", "errors"), 0)
+        writer = ScraperOrchestrator()
+        for start in range(0, len(batch), BATCH_SIZE):
+            writer._write_batch(db, batch[start:start + BATCH_SIZE], stats)
+        db.close()
+        return stats
+
+    write(items(0, SEED_ROWS))
+    engine.dispose()  # No connection is shared with the forked readers
+
+    done, results = multiprocessing.Event(), multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=read_loop, args=(seed, done, results)) for seed in range(readers)]
+    batch = items(SEED_ROWS, SEED_ROWS + rows)
+    for process in processes:
+        process.start()
+    started = time.perf_counter()
+    stats = write(batch)
+    elapsed = time.perf_counter() - started
+    done.set()
+    latencies, errors = [], []
+    for _process in processes:
+        process_latencies, process_errors = results.get()
+        latencies += process_latencies
+        errors += process_errors
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+
+    def percentile(fraction: float) -> float:
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000 if latencies else float("nan")
+
+    print(f"{mode:10s} write {rows / elapsed:6.0f} rows/s ({stats['errors']} errors) | "
+          f"reads {len(latencies) / elapsed:5.0f}/s p50 {percentile(.5):6.1f} ms p99 {percentile(.99):7.1f} ms "
+          f"max {percentile(1):7.1f} ms | {len(errors)} read errors {sorted(set(errors)) if errors else ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=6000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--mode", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    if args.single:
+        main(args.rows, args.readers, args.single, os.environ["BENCHMARK_DIRECTORY"])
+    else:
+        # One process per mode: each needs its own engines and settings
+        import subprocess
+        with tempfile.TemporaryDirectory() as directory:
+            for mode in args.mode:
+                subprocess.run([sys.executable, "-m", "benchmarks.sqlite_concurrency", "--rows", str(args.rows),
+                                "--readers", str(args.readers), "--single", mode],
+                               env={**os.environ, "BENCHMARK_DIRECTORY": directory}, check=True)
@@ -0,0 +1,66 @@
+from pathlib import Path
+import pytest
+from app.config import settings
+from app.scraper.detail_scraper import DetailScraper
+from app.scraper.listings_scraper import ListingsScraper
+
+# Extraction must not depend on the HTML backend (SCRAPER_HTML_PARSER) or on
+# partial parsing (SCRAPER_PARTIAL_PARSE): every combination has to give the
+# output of a full html.parser parse, field for field.
+
+FIXTURES = Path(__file__).parent / "fixtures"
+DETAIL_PAGES = sorted(FIXTURES.glob("detail_*.html"))
+LISTING_PAGES = sorted(FIXTURES.glob("listings_*.html"))
+
+
+def extract_corpus(monkeypatch, parser: str, partial: bool) -> dict:
+    monkeypatch.setattr(settings, "SCRAPER_HTML_PARSER", parser)
+    monkeypatch.setattr(settings, "SCRAPER_PARTIAL_PARSE", partial)
+    details = DetailScraper()
+    listings = ListingsScraper()
+    output = {}
+    for path in DETAIL_PAGES:
+        output[path.name] = details.parse_detail(f"https://anabi.just.ro/licitatiionline/ads/{path.stem}", path.read_text())
+    for path in LISTING_PAGES:
+        soup = listings.parse_html(path.read_text(), parse_only=ListingsScraper.PARSE_ONLY)
+        output[path.name] = (listings.extract_listings(soup), listings.parse_total_pages(soup))
+    return output
+
+
+def test_reference_extraction(monkeypatch):
+    # Guards the comparison below against backends agreeing on nothing
+    output = extract_corpus(monkeypatch, "html.parser", False)
+
+    open_listing = output["detail_open.html"]
+    assert open_listing["title"] == "Autoturism Dacia Logan 1.4 MPI"
+    assert open_listing["current_offer"] == "13,815.00 lei"
+    assert open_listing["bid_count"] == 3
+    assert (open_listing["city"], open_listing["county"]) == ("Bragadiru", "Ilfov")
+    assert open_listing["status"] == "Active" and open_listing["is_active"]
+
+    closed_listing = output["detail_closed.html"]
+    assert closed_listing["title"] == "ADJUDECAT - Lot bijuterii aur 14K"
+    assert closed_listing["status"] == "ADJUDECAT" and closed_listing["is_sold"]
+    assert closed_listing["auction_status"] == "Closed"
+    assert closed_listing["category"] == "Diverse"
+
+    cards, total_pages = output["listings_page.html"]
+    assert [card["detail_url"] for card in cards] == [
+        "https://anabi.just.ro/licitatiionline/ads/101",
+        "https://anabi.just.ro/licitatiionline/ads/102",
+    ]
+    assert total_pages == 57
+    cards, total_pages = output["listings_page_single.html"]
+    assert len(cards) == 1 and total_pages is None
+
+
+@pytest.mark.parametrize("parser, partial", [
+    ("html.parser", True),
+    ("lxml", False),
+    ("lxml", True),
+])
+def test_same_output_for_every_backend(monkeypatch, parser, partial):
+    if parser == "lxml":
+        pytest.importorskip("lxml")
+    reference = extract_corpus(monkeypatch, "html.parser", False)
+    assert extract_corpus(monkeypatch, parser, partial) == reference
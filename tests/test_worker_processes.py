@@ -0,0 +1,133 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models.listing import Listing
+from app.models.scrape_run import CrawlJob, ScrapeRun
+import app.models.asset, app.models.subscription
+
+# Several `python -m app.tasks.worker` processes share one SQLite file and
+# one run, as they would on a host: every job has to be fetched by exactly one
+# of them, and the jobs of a worker killed mid-run have to be picked up by
+# the others once its leases run out.
+
+ROOT = Path(__file__).parent.parent
+DETAIL_PAGE = (Path(__file__).parent / "fixtures" / "detail_open.html").read_bytes()
+JOBS = 40
+WORKERS = 3
+LEASE_SECONDS = 2
+
+
+class Site(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SiteHandler)
+        # Requests wait for `open`, so the first worker can be killed while
+        # it holds leases; only requests made once it is open are counted
+        self.open = threading.Event()
+        self.fetched = Counter()
+        self.lock = threading.Lock()
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.server.open.is_set():
+            with self.server.lock:
+                self.server.fetched[self.path] += 1
+        elif not self.server.open.wait(30):
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(DETAIL_PAGE)))
+        self.end_headers()
+        try:
+            self.wfile.write(DETAIL_PAGE)
+        except OSError:
+            pass  # The killed worker's connection
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_worker(directory: Path, database: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "DATABASE_URL": database,
+        "SCRAPER_WORKERS": str(WORKERS),
+        "SCRAPER_REQUESTS_PER_SECOND": "200",
+        "SCRAPER_CONCURRENCY": "2",
+        "SCRAPER_LEASE_SECONDS": str(LEASE_SECONDS),
+        "SCRAPER_JOB_POLL_SECONDS": "0.2",
+        "SCRAPER_WRITE_FLUSH_SECONDS": "0.2",
+        "SCRAPER_PARSE_WORKERS": "0",
+        "SCRAPER_ARCHIVE_ENABLED": "false",
+        "SCRAPER_MAX_RETRIES": "0",
+    }
+    # Run from the temporary directory, so the workers' log file lands there
+    return subprocess.Popen([sys.executable, "-m", "app.tasks.worker", "--once"], cwd=directory, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def test_workers_share_jobs_and_reclaim_leases(tmp_path):
+    database = f"sqlite:///{tmp_path / 'anabi.db'}"
+    engine = create_engine(database)
+    Base.metadata.create_all(bind=engine)
+
+    site = Site()
+    threading.Thread(target=site.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{site.server_address[1]}"
+    urls = [f"{base}/licitatiionline/ads/{number}" for number in range(JOBS)]
+    with Session(engine) as db:
+        run = ScrapeRun(status="running", discovery_done=True)
+        db.add(run)
+        db.flush()
+        db.add_all(CrawlJob(run_id=run.id, detail_url=url, category="Autovehicule") for url in urls)
+        db.commit()
+        run_id = run.id
+
+    def jobs() -> dict:
+        with Session(engine) as db:
+            return {job.detail_url: job for job in db.query(CrawlJob).filter(CrawlJob.run_id == run_id)}
+
+    workers = []
+    try:
+        # A first worker claims some jobs and dies before finishing them
+        doomed = start_worker(tmp_path, database)
+        deadline = time.monotonic() + 30
+        while not any(job.lease_owner for job in jobs().values()):
+            assert doomed.poll() is None and time.monotonic() < deadline, "the first worker never claimed a job"
+            time.sleep(0.1)
+        doomed.send_signal(signal.SIGKILL)
+        doomed.wait()
+        orphaned = {url for url, job in jobs().items() if job.lease_owner}
+
+        site.open.set()
+        workers = [start_worker(tmp_path, database) for _ in range(WORKERS)]
+        for worker in workers:
+            _, errors = worker.communicate(timeout=60)
+            assert worker.returncode == 0, errors.decode()
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.kill()
+        site.shutdown()
+
+    finished = jobs()
+    assert {job.status for job in finished.values()} == {"done"}
+    assert all(job.lease_owner is None for job in finished.values())
+    # Claimed once by the survivors; twice for the dead worker's jobs
+    assert {url: job.attempts for url, job in finished.items()} == {url: 2 if url in orphaned else 1 for url in urls}
+    assert site.fetched == Counter({url[len(base):]: 1 for url in urls})
+    with Session(engine) as db:
+        assert db.query(Listing).count() == JOBS
+    engine.dispose()